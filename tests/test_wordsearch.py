@@ -1,15 +1,27 @@
 from typing import TYPE_CHECKING
 
-from pytest import mark
+from pytest import mark, raises
 
 from wordsearch import WordSearch
-from utils import Grid, Trie
+from utils import (
+    AnchoredGrid,
+    BitGrid,
+    DirectionalGrid,
+    Grid,
+    KGramIndex,
+    SuffixArray,
+    TiledGrid,
+    Trie,
+)
 
-from tests.data import GRID, ROW_LENGTH, WINDOW_SIZE, WORDS_MAP
+from tests.data import GRID, GRID_FILE, MAX_WORD_LENGTH, ROW_LENGTH, WINDOW_SIZE, WORDS_MAP
 
 
 if TYPE_CHECKING:
-    from typing import Type, Union
+    from typing import Dict, List, Set, Tuple, Type, Union
+    from pathlib import Path
+
+    from utils.backend import Location
 
     DataType = Union[Type[Grid], Type[Trie]]
 
@@ -29,7 +41,215 @@ def test_data_generation(benchmark, use_trie: bool, expected_type: 'DataType') -
     assert isinstance(wordsearch._data, expected_type)
 
 
+def test_data_generation_suffix_array(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID,
+        axis_length=ROW_LENGTH,
+        use_suffix_array=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, SuffixArray)
+
+
+def test_data_generation_all_directions(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID,
+        axis_length=ROW_LENGTH,
+        all_directions=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, DirectionalGrid)
+
+
+def test_data_generation_anchored(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID,
+        axis_length=ROW_LENGTH,
+        use_anchors=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, AnchoredGrid)
+
+
+def test_data_generation_bitsets(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID,
+        axis_length=ROW_LENGTH,
+        use_bitsets=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, BitGrid)
+
+
+def test_data_generation_kgrams(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID,
+        axis_length=ROW_LENGTH,
+        use_kgrams=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, KGramIndex)
+
+
+def test_data_generation_conflict() -> None:
+    with raises(RuntimeError):
+        WordSearch(GRID, use_trie=True, axis_length=ROW_LENGTH, use_suffix_array=True)
+
+
 @mark.parametrize("word, expected", WORDS_MAP.items())
 def test_is_present(benchmark, word: str, expected: bool) -> None:
     result = benchmark(WS.is_present, word=word)  # type: bool
     assert result == expected
+
+
+def test_find_all(benchmark) -> None:
+    result = benchmark(WS.find_all, words=WORDS_MAP.keys())  # type: Set[str]
+
+    assert result == {
+        word
+        for word, expected in WORDS_MAP.items()
+        if expected
+    }
+
+
+def test_stream(benchmark) -> None:
+    words = list(WORDS_MAP)  # type: List[str]
+    chunks = [
+        words[index:index + 3]
+        for index in range(0, len(words), 3)
+    ]  # type: List[List[str]]
+    result = benchmark(lambda: list(WS.stream(chunks)))  # type: List[Tuple[str, bool]]
+
+    assert result == list(WORDS_MAP.items())
+
+
+def test_locate(benchmark) -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH)  # type: WordSearch
+    result = benchmark(wordsearch.locate_all, words=WORDS_MAP.keys())  # type: Dict[str, List[Location]]
+
+    assert isinstance(wordsearch._locator, AnchoredGrid)
+    assert {
+        word: bool(locations)
+        for word, locations in result.items()
+        if word
+    } == {
+        word: expected
+        for word, expected in WORDS_MAP.items()
+        if word
+    }
+    for word, locations in result.items():
+        assert wordsearch.locate(word) == locations
+        assert wordsearch.count(word) == len(locations)
+
+
+def test_locate_own_index() -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH, all_directions=True)  # type: WordSearch
+    word = GRID[5009:5005:-1]  # type: str
+
+    assert (5, 9, 'left') in wordsearch.locate(word)
+    assert wordsearch._locator is wordsearch._data
+
+
+def test_locate_tiles() -> None:
+    wordsearch = WordSearch(GRID_FILE, max_word=MAX_WORD_LENGTH, use_tiles=True)  # type: WordSearch
+
+    with raises(RuntimeError):
+        wordsearch.locate('a')
+
+
+def test_apply_patch() -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH)  # type: WordSearch
+    word = GRID[:ROW_LENGTH]  # type: str
+    assert wordsearch.is_present(word)
+    assert (0, 0, 'right') in wordsearch.locate(word)
+
+    wordsearch.apply_patch([(0, 0, 'z'), (0, 1, 'z')])
+
+    assert not wordsearch.is_present(word)
+    assert wordsearch.is_present('zz' + word[2:])
+    assert (0, 0, 'right') in wordsearch.locate('zz' + word[2:])
+    assert wordsearch.locate(word) == []
+
+
+def test_apply_patch_leaves_grid() -> None:
+    grid = bytearray(GRID.encode('ascii'))  # type: bytearray
+    wordsearch = WordSearch(grid, axis_length=ROW_LENGTH)  # type: WordSearch
+    wordsearch.set_cell(0, 0, 'z')
+    wordsearch.set_cell(0, 1, 'z')
+
+    assert grid == GRID.encode('ascii')
+    assert wordsearch._grid is grid
+    assert wordsearch.locate('zz' + GRID[2:ROW_LENGTH]) == [(0, 0, 'right')]
+    assert grid == GRID.encode('ascii')
+
+
+def test_set_cell_trie() -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH, max_word=MAX_WORD_LENGTH, use_trie=True)  # type: WordSearch
+    word = GRID[ROW_LENGTH:ROW_LENGTH + MAX_WORD_LENGTH]  # type: str
+    wordsearch.set_cell(1, 0, 'z')
+
+    assert wordsearch.is_present('z' + word[1:])
+
+
+def test_apply_patch_unsupported() -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH, use_bitsets=True)  # type: WordSearch
+
+    with raises(RuntimeError):
+        wordsearch.set_cell(0, 0, 'z')
+
+
+def test_is_present_cache_disabled() -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH, cache_size=0)  # type: WordSearch
+    for word, expected in WORDS_MAP.items():
+        assert wordsearch.is_present(word) == expected
+
+    assert wordsearch.cache_stats()['size'] == 0
+    assert wordsearch.cache_stats()['misses'] == len(WORDS_MAP)
+
+
+def test_data_generation_tiles(benchmark) -> None:
+    wordsearch = benchmark(
+        WordSearch,
+        grid=GRID_FILE,
+        use_tiles=True,
+    )  # type: WordSearch
+    assert isinstance(wordsearch._data, TiledGrid)
+
+
+@mark.parametrize('grid, use_tiles', ((GRID, True), (GRID_FILE, False)))
+def test_data_generation_tiles_path(grid: 'Union[str, Path]', use_tiles: bool) -> None:
+    with raises(RuntimeError):
+        WordSearch(grid, axis_length=ROW_LENGTH, use_tiles=use_tiles)
+
+
+@mark.parametrize('backend, expected_type', (
+    ('grid', Grid),
+    ('bitset', BitGrid),
+    ('anchored', AnchoredGrid),
+))
+def test_data_generation_backend(backend: str, expected_type: 'DataType') -> None:
+    wordsearch = WordSearch(GRID, axis_length=ROW_LENGTH, backend=backend)  # type: WordSearch
+
+    assert wordsearch.backend == backend
+    assert isinstance(wordsearch._data, expected_type)
+
+
+def test_data_generation_backend_conflict() -> None:
+    with raises(RuntimeError):
+        WordSearch(GRID, axis_length=ROW_LENGTH, use_trie=True, backend='grid')
+
+
+@mark.parametrize('word_count, expected', ((1, 'anchored'), (10**6, 'trie')))
+def test_data_generation_auto(word_count: int, expected: str) -> None:
+    wordsearch = WordSearch(
+        GRID,
+        axis_length=ROW_LENGTH,
+        max_word=MAX_WORD_LENGTH,
+        backend='auto',
+        word_count=word_count,
+    )  # type: WordSearch
+
+    assert wordsearch.backend == expected
+    for word, present in WORDS_MAP.items():
+        assert wordsearch.is_present(word) == present
+    wordsearch.close()
@@ -0,0 +1,122 @@
+from typing import TYPE_CHECKING
+
+from pytest import mark, raises
+
+from utils.anchor import AnchoredGrid
+from utils.directions import DIRECTIONS, DirectionalGrid
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import Dict, List
+
+    from numpy import ndarray
+
+    from utils.anchor import Starts
+    from utils.backend import Location
+
+
+ANCHORED_INSTANCE = AnchoredGrid(GRID, ROW_LENGTH)  # type: AnchoredGrid
+ALL_DIRECTIONS = AnchoredGrid(GRID, ROW_LENGTH, DIRECTIONS)  # type: AnchoredGrid
+DIRECTIONAL_INSTANCE = DirectionalGrid(GRID, ROW_LENGTH)  # type: DirectionalGrid
+
+
+def test_AnchoredGrid___init___wrong_size() -> None:
+    with raises(RuntimeError):
+        AnchoredGrid(GRID[:-1], ROW_LENGTH)
+
+
+def test_AnchoredGrid__index_letters(benchmark) -> None:
+    result = benchmark(ANCHORED_INSTANCE._index_letters)  # type: ndarray
+
+    assert sorted(result.tolist()) == list(range(ROW_LENGTH**2))
+
+
+@mark.parametrize('letter', 'aqz')
+def test_AnchoredGrid__letter_positions(letter: str) -> None:
+    result = ANCHORED_INSTANCE._letter_positions(ord(letter))  # type: ndarray
+
+    assert result.tolist() == [
+        index
+        for index, character in enumerate(GRID)
+        if character == letter
+    ]
+
+
+@mark.parametrize('direction, stride', (('right', 1), ('down', ROW_LENGTH)))
+def test_AnchoredGrid__search(benchmark, direction: str, stride: int) -> None:
+    word = GRID[1234::stride][:6]  # type: str
+    result = benchmark(
+        ANCHORED_INSTANCE._search,
+        key=word.encode('ascii'),
+        direction=DIRECTIONS[direction],
+    )  # type: Starts
+
+    assert 1234 in result.tolist()
+    for start in result.tolist():
+        assert GRID[start::stride][:len(word)] == word
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_AnchoredGrid___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(ANCHORED_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+@mark.parametrize('word', [
+    GRID[start:start + 6][::step]
+    for start in range(0, 6000, 1000)
+    for step in (1, -1)
+] + [
+    GRID[start::ROW_LENGTH + 1][:6]
+    for start in range(0, 6)
+])
+def test_AnchoredGrid___contains___all_directions(word: str) -> None:
+    assert (word in ALL_DIRECTIONS) == (word in DIRECTIONAL_INSTANCE)
+    assert word in ALL_DIRECTIONS
+
+
+@mark.parametrize('word, expected', (
+    ('', True),
+    (GRID[:ROW_LENGTH], True),
+    (GRID[ROW_LENGTH - 3:ROW_LENGTH + 3], False),
+    ('A', False),
+    ('é', False),
+))
+def test_AnchoredGrid___contains___edges(word: str, expected: bool) -> None:
+    assert (word in ANCHORED_INSTANCE) == expected
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_AnchoredGrid_locate(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(ANCHORED_INSTANCE.locate, word=word)  # type: List[Location]
+
+    assert bool(result) == (expected and bool(word))
+    assert result == sorted(result)
+    for row, column, direction in result:
+        stride = 1 if direction == 'right' else ROW_LENGTH  # type: int
+        assert GRID[row*ROW_LENGTH + column::stride][:len(word)] == word
+
+
+def test_AnchoredGrid_locate_all_directions() -> None:
+    word = GRID[5005:5009]  # type: str
+
+    assert ALL_DIRECTIONS.locate(word) == DIRECTIONAL_INSTANCE.locate(word)
+    assert (5, 5, 'right') in ALL_DIRECTIONS.locate(word)
+
+
+@mark.parametrize('word', ('', 'A', 'é', GRID[:ROW_LENGTH] + 'a'))
+def test_AnchoredGrid_locate_edges(word: str) -> None:
+    assert ANCHORED_INSTANCE.locate(word) == []
+
+
+def test_AnchoredGrid_locate_all() -> None:
+    result = ANCHORED_INSTANCE.locate_all(WORDS_MAP)  # type: Dict[str, List[Location]]
+
+    assert list(result) == list(WORDS_MAP)
+    assert all(
+        ANCHORED_INSTANCE.count(word) == len(locations)
+        for word, locations in result.items()
+    )
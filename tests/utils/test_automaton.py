@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING
+from itertools import chain
+
+from pytest import mark
+
+from utils.automaton import Automaton
+from utils.grid import Grid
+
+from tests.data import GRID, ROW_LENGTH, WINDOW_SIZE, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import List, Set
+
+
+GRID_INSTANCE = Grid(GRID, ROW_LENGTH, WINDOW_SIZE, False)  # type: Grid
+FOUND_WORDS = {
+    word
+    for word, expected in WORDS_MAP.items()
+    if expected
+}  # type: Set[str]
+
+
+def test_Automaton___init__(benchmark) -> None:
+    automaton = benchmark(Automaton, words=WORDS_MAP.keys())  # type: Automaton
+
+    assert len(automaton) == len(WORDS_MAP)
+
+
+@mark.parametrize('words, texts, expected', (
+    (['he', 'she', 'his', 'hers'], ['ushers'], {'he', 'she', 'hers'}),
+    (['a', 'ab', 'bab', 'bc'], ['xbabc'], {'a', 'ab', 'bab', 'bc'}),
+    (['abc', 'cd'], ['ab', 'cd'], {'cd'}),
+    (['', 'z'], ['abc'], {''}),
+))
+def test_Automaton_search(words: 'List[str]', texts: 'List[str]', expected: 'Set[str]') -> None:
+    assert Automaton(words).search(texts) == expected
+
+
+def test_Automaton_search_grid(benchmark) -> None:
+    automaton = Automaton(WORDS_MAP.keys())  # type: Automaton
+    texts = [
+        bytes(line).decode('ascii')
+        for line in chain(GRID_INSTANCE.rows, GRID_INSTANCE.columns)
+    ]  # type: List[str]
+    result = benchmark(automaton.search, texts=texts)  # type: Set[str]
+
+    assert result == FOUND_WORDS
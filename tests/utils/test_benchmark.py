@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING
+from random import Random
+
+from utils.benchmark import (
+    compare,
+    create_words,
+    hit_ratio_of,
+    run_benchmarks,
+    skip_reason,
+)
+
+from tests.data import GRID, ROW_LENGTH
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List
+
+    Record = Dict[str, Any]
+
+
+def _record(backend: str, build_seconds: float) -> 'Record':
+    return {
+        'backend': backend,
+        'multiprocessing': False,
+        'size': 100,
+        'words': 10,
+        'hit_ratio': 0.5,
+        'word_lengths': [3, 8],
+        'build_seconds': build_seconds,
+        'query_seconds': 1.0,
+        'batch_seconds': None,
+    }
+
+
+def test_create_words() -> None:
+    words = create_words(GRID, ROW_LENGTH, 200, 1, (3, 5), Random(0))  # type: List[str]
+
+    assert len(words) == 200
+    assert all(3 <= len(word) <= 5 for word in words)
+    lines = [
+        GRID[row*ROW_LENGTH:(row + 1)*ROW_LENGTH]
+        for row in range(ROW_LENGTH)
+    ] + [
+        GRID[column::ROW_LENGTH]
+        for column in range(ROW_LENGTH)
+    ]  # type: List[str]
+    assert all(
+        any(word in line for line in lines)
+        for word in words
+    )
+
+
+def test_create_words_misses() -> None:
+    words = create_words(GRID, ROW_LENGTH, 200, 0, (3, 5), Random(0))  # type: List[str]
+
+    assert len(words) == 200
+    assert all(3 <= len(word) <= 5 for word in words)
+    assert hit_ratio_of(GRID, ROW_LENGTH, words) == 0
+
+
+def test_create_words_seeded() -> None:
+    assert (
+        create_words(GRID, ROW_LENGTH, 50, 0.5, (3, 8), Random(1))
+        == create_words(GRID, ROW_LENGTH, 50, 0.5, (3, 8), Random(1))
+    )
+
+
+def test_compare() -> None:
+    baseline = [_record('grid', 1.0), _record('trie', 1.0)]  # type: List[Record]
+    records = [_record('grid', 2.0), _record('trie', 1.1), _record('kgram', 5.0)]  # type: List[Record]
+
+    regressions = compare(records, baseline, 1.25)  # type: List[str]
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('grid (no multiprocess, 100x100): build_seconds 2.00x')
+
+
+def test_skip_reason() -> None:
+    assert skip_reason('grid', 100, 20, None) is None
+    assert skip_reason('trie', 100, 9, None) == 'words longer than 8'
+    assert skip_reason('suffix_array', 100, 8, 1) == 'not enough memory'
+    assert skip_reason('tiled', 100, 8, 1) is None
+
+
+def test_run_benchmarks() -> None:
+    records = run_benchmarks((20,), ('grid', 'kgram'), 20, multiprocess=False)  # type: List[Record]
+
+    assert [record['backend'] for record in records] == ['grid', 'kgram']
+    assert all(record['consistent'] for record in records)
+    assert records[0]['found'] == records[1]['found']
+    assert records[0]['achieved_hit_ratio'] == records[0]['found'] / 20
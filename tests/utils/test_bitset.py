@@ -0,0 +1,68 @@
+from typing import TYPE_CHECKING
+
+from pytest import mark, raises
+
+from utils.bitset import BitGrid
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import Set
+
+    from utils.bitset import Masks
+
+
+BIT_INSTANCE = BitGrid(GRID, ROW_LENGTH)  # type: BitGrid
+FOUND_WORDS = {
+    word
+    for word, expected in WORDS_MAP.items()
+    if expected
+}  # type: Set[str]
+
+
+def test_BitGrid___init___wrong_size() -> None:
+    with raises(RuntimeError):
+        BitGrid(GRID[:-1], ROW_LENGTH)
+
+
+def test_BitGrid__generate_masks(benchmark) -> None:
+    result = benchmark(BIT_INSTANCE._generate_masks, grid=GRID)  # type: Masks
+
+    assert len(result) == 26
+    assert sum(bin(mask).count('1') for mask in result.values()) == 2 * ROW_LENGTH**2
+    for index in range(ROW_LENGTH):
+        assert result[GRID[index]] >> index & 1
+        assert result[GRID[index * ROW_LENGTH]] >> (ROW_LENGTH**2 + ROW_LENGTH + index) & 1
+    assert not any(mask >> ROW_LENGTH & 1 for mask in result.values())
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_BitGrid___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(BIT_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+@mark.parametrize('word, expected', (
+    ('', True),
+    (GRID[:ROW_LENGTH], True),
+    (GRID[ROW_LENGTH - 1::ROW_LENGTH], True),
+    (GRID[ROW_LENGTH - 3:ROW_LENGTH + 3], False),
+    ('A', False),
+))
+def test_BitGrid___contains___edges(word: str, expected: bool) -> None:
+    assert (word in BIT_INSTANCE) == expected
+
+
+def test_BitGrid_find_all(benchmark) -> None:
+    result = benchmark(BIT_INSTANCE.find_all, words=WORDS_MAP.keys())  # type: Set[str]
+
+    assert result == FOUND_WORDS
+
+
+def test_BitGrid_find_all_prefixes() -> None:
+    words = ['', 'A', GRID[:8], GRID[:4], GRID[:4] + 'A', GRID[:6], GRID[:6]]
+    result = BIT_INSTANCE.find_all(words)  # type: Set[str]
+
+    assert result == {'', GRID[:8], GRID[:4], GRID[:6]}
@@ -0,0 +1,70 @@
+from typing import TYPE_CHECKING
+
+from pytest import mark, raises
+
+from utils.cache import LRUCache
+
+from tests.data import WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+def _search(word: str) -> bool:
+    return WORDS_MAP[word]
+
+
+def test_LRUCache_lookup(benchmark) -> None:
+    cache = LRUCache(len(WORDS_MAP))  # type: LRUCache
+    for word in WORDS_MAP:
+        cache.lookup(word, _search)
+
+    result = benchmark(
+        lambda: [cache.lookup(word, _search) for word in WORDS_MAP]
+    )  # type: List[bool]
+
+    assert result == list(WORDS_MAP.values())
+    assert cache.misses == len(WORDS_MAP)
+    assert cache.evictions == 0
+
+
+def test_LRUCache_lookup_evicts_least_recent() -> None:
+    searched = []  # type: List[str]
+    cache = LRUCache(2)  # type: LRUCache
+    for word in ('a', 'b', 'a', 'c', 'b'):
+        cache.lookup(word, lambda word: searched.append(word) or True)
+
+    assert searched == ['a', 'b', 'c', 'b']
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    assert cache.stats() == {
+        'hits': 1,
+        'misses': 4,
+        'evictions': 2,
+        'size': 2,
+        'max_size': 2,
+    }
+
+
+@mark.parametrize('max_size, expected', ((0, 0), (None, 3)))
+def test_LRUCache_lookup_size(max_size: int, expected: int) -> None:
+    cache = LRUCache(max_size)  # type: LRUCache
+    for word in ('a', 'b', 'c', 'a'):
+        cache.lookup(word, bool)
+
+    assert len(cache) == expected
+    assert cache.evictions == 0
+
+
+def test_LRUCache_negative() -> None:
+    with raises(RuntimeError):
+        LRUCache(-1)
+
+
+def test_LRUCache_clear() -> None:
+    cache = LRUCache()  # type: LRUCache
+    cache.lookup('a', bool)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats()['misses'] == 1
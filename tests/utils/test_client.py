@@ -0,0 +1,40 @@
+from typing import TYPE_CHECKING
+from tempfile import mkdtemp
+from threading import Thread
+
+from pytest import raises
+
+from utils.client import QueryClient
+from utils.server import QueryServer
+from wordsearch import WordSearch
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+WS = WordSearch(GRID, axis_length=ROW_LENGTH)  # type: WordSearch
+SOCKET = mkdtemp() + '/client.sock'  # type: str
+SERVER = QueryServer(SOCKET, {'grid': WS, 'other': WS})  # type: QueryServer
+Thread(target=SERVER.serve_forever, daemon=True).start()
+
+def test_QueryClient_find(benchmark) -> None:
+    with QueryClient(SOCKET, 'grid') as client:
+        result = benchmark(client.find, words=WORDS_MAP.keys())  # type: List[bool]
+
+    assert result == list(WORDS_MAP.values())
+
+
+def test_QueryClient_is_present(benchmark) -> None:
+    with QueryClient(SOCKET, 'other') as client:
+        result = benchmark(client.is_present, word='xryboxlexc')  # type: bool
+
+    assert result
+
+
+def test_QueryClient_find_error() -> None:
+    with QueryClient(SOCKET) as client:
+        with raises(RuntimeError):
+            client.find(['a'])
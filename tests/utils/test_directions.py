@@ -0,0 +1,104 @@
+from typing import TYPE_CHECKING
+
+from pytest import mark, raises
+
+from utils.directions import DIRECTIONS, DirectionalGrid
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import Dict, List
+
+    from numpy import ndarray
+
+    from utils.backend import Location
+    from utils.directions import Direction
+
+
+DIRECTIONAL_INSTANCE = DirectionalGrid(GRID, ROW_LENGTH)  # type: DirectionalGrid
+AXES_INSTANCE = DirectionalGrid(GRID, ROW_LENGTH, ('right', 'down'))  # type: DirectionalGrid
+
+
+def _walk(row: int, column: int, direction: 'Direction', length: int) -> str:
+    row_step, column_step = direction
+    return ''.join(
+        GRID[(row + index*row_step)*ROW_LENGTH + column + index*column_step]
+        for index in range(length)
+    )
+
+
+DIRECTION_WORDS = {
+    name: _walk(500, 500, direction, 10)
+    for name, direction in DIRECTIONS.items()
+}  # type: Dict[str, str]
+
+
+def test_DirectionalGrid___init___wrong_size() -> None:
+    with raises(RuntimeError):
+        DirectionalGrid(GRID[:-1], ROW_LENGTH)
+
+
+@mark.parametrize('direction', DIRECTIONS.values())
+def test_DirectionalGrid__views(benchmark, direction: 'Direction') -> None:
+    views = benchmark(DIRECTIONAL_INSTANCE._views, direction=direction, length=4)  # type: List[ndarray]
+
+    assert len(views) == 4
+    for view in views:
+        assert view.base is not None
+        assert view.shape == views[0].shape
+
+
+@mark.parametrize('name, word', DIRECTION_WORDS.items())
+def test_DirectionalGrid__search(benchmark, name: str, word: str) -> None:
+    direction = DIRECTIONS[name]  # type: Direction
+    rows, columns = benchmark(
+        DIRECTIONAL_INSTANCE._search,
+        key=word.encode('ascii'),
+        direction=direction,
+    )
+    row_start, _ = DIRECTIONAL_INSTANCE._bounds(direction[0], len(word))
+    column_start, _ = DIRECTIONAL_INSTANCE._bounds(direction[1], len(word))
+
+    assert (500 - row_start, 500 - column_start) in zip(rows.tolist(), columns.tolist())
+
+
+@mark.parametrize('name, word', DIRECTION_WORDS.items())
+def test_DirectionalGrid___contains___directions(name: str, word: str) -> None:
+    assert word in DIRECTIONAL_INSTANCE
+    assert (word in AXES_INSTANCE) == (name in ('right', 'down'))
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_DirectionalGrid___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(AXES_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+@mark.parametrize('word, expected', (
+    ('', True),
+    (GRID[:ROW_LENGTH], True),
+    (GRID[:ROW_LENGTH][::-1], True),
+    (GRID[:ROW_LENGTH] + 'a', False),
+    ('é', False),
+))
+def test_DirectionalGrid___contains___edges(word: str, expected: bool) -> None:
+    assert (word in DIRECTIONAL_INSTANCE) == expected
+
+
+@mark.parametrize('name, word', DIRECTION_WORDS.items())
+def test_DirectionalGrid_locate(name: str, word: str) -> None:
+    result = DIRECTIONAL_INSTANCE.locate(word)  # type: List[Location]
+
+    assert (500, 500, name) in result
+    for row, column, direction in result:
+        assert _walk(row, column, DIRECTIONS[direction], len(word)) == word
+
+
+def test_DirectionalGrid_locate_axes() -> None:
+    word = GRID[ROW_LENGTH - 4:ROW_LENGTH]  # type: str
+
+    assert (0, ROW_LENGTH - 4, 'right') in AXES_INSTANCE.locate(word)
+    assert all(direction in ('right', 'down') for _, _, direction in AXES_INSTANCE.locate(word))
+    assert AXES_INSTANCE.locate('') == []
@@ -1,12 +1,20 @@
 from typing import TYPE_CHECKING
+from io import StringIO
+from json import loads
 
-from utils.files import read_grid, read_words
+from pytest import mark
+
+from utils import files as files_module
+from utils.files import count_words, iter_words, read_grid, read_grid_bytes, read_words, write_results
 
 from tests.data import GRID_FILE, GRID, WORDS_FILE, WORDS
 
 
 if TYPE_CHECKING:
     from typing import List
+    from pathlib import Path
+
+    from _pytest.monkeypatch import MonkeyPatch
 
 
 def test_read_grid(benchmark) -> None:
@@ -16,3 +24,57 @@ def test_read_grid(benchmark) -> None:
 def test_read_words(benchmark) -> None:
     words = benchmark(read_words, path=WORDS_FILE)  # type: List[str]
     assert words == WORDS
+
+
+def test_read_grid_bytes(benchmark) -> None:
+    grid = benchmark(read_grid_bytes, path=GRID_FILE)  # type: bytearray
+    assert grid == GRID.encode('ascii')
+
+
+@mark.parametrize('block', (1, 7, 1000))
+def test_read_grid_bytes_blocks(monkeypatch: 'MonkeyPatch', tmp_path: 'Path', block: int) -> None:
+    monkeypatch.setattr(files_module, 'GRID_BLOCK_SIZE', block)
+    path = tmp_path / 'grid.txt'  # type: Path
+    path.write_bytes(b'abc\ndef\r\nghi\n')
+
+    assert read_grid_bytes(path) == b'abcdefghi'
+    assert read_grid_bytes(GRID_FILE) == GRID.encode('ascii')
+
+
+@mark.parametrize('chunk_size', (1, 7, len(WORDS), len(WORDS) + 1))
+def test_iter_words(benchmark, chunk_size: int) -> None:
+    chunks = benchmark(
+        lambda: list(iter_words(WORDS_FILE, chunk_size))
+    )  # type: List[List[str]]
+
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    assert [word for chunk in chunks for word in chunk] == WORDS
+
+
+def test_iter_words_empty(tmp_path: 'Path') -> None:
+    path = tmp_path / 'words.txt'  # type: Path
+    path.write_text('')
+
+    assert list(iter_words(path)) == []
+
+
+def test_write_results() -> None:
+    file = StringIO()  # type: StringIO
+    write_results(file, [('abc', True), ('xyz', False)])
+
+    assert [loads(line) for line in file.getvalue().splitlines()] == [
+        {'word': 'abc', 'found': True},
+        {'word': 'xyz', 'found': False},
+    ]
+
+
+@mark.parametrize('contents, expected', (('', 0), ('a', 1), ('a\n', 1), ('a\nb', 2), ('a\n\nb\n', 3)))
+def test_count_words(tmp_path: 'Path', contents: str, expected: int) -> None:
+    path = tmp_path / 'words.txt'  # type: Path
+    path.write_text(contents)
+
+    assert count_words(path) == expected
+
+
+def test_count_words_file(benchmark) -> None:
+    assert benchmark(count_words, path=WORDS_FILE) == len(WORDS)
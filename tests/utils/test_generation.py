@@ -0,0 +1,86 @@
+from typing import TYPE_CHECKING
+
+from numpy import frombuffer, uint8
+from pytest import mark
+
+from utils.generation import (
+    create_grid,
+    find_present,
+    generate_words,
+    write_grid,
+)
+from utils.tiles import map_grid
+
+from tests.data import GRID, GRID_FILE, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Set
+    from pathlib import Path
+
+    from numpy import ndarray
+
+
+GRID_ARRAY = frombuffer(GRID.encode('ascii'), dtype=uint8).reshape(ROW_LENGTH, ROW_LENGTH)  # type: ndarray
+LINES = [
+    GRID[row*ROW_LENGTH:(row + 1)*ROW_LENGTH]
+    for row in range(ROW_LENGTH)
+] + [
+    GRID[column::ROW_LENGTH]
+    for column in range(ROW_LENGTH)
+]  # type: List[str]
+
+
+def test_create_grid() -> None:
+    grid = create_grid(50, 1)  # type: str
+
+    assert len(grid) == 50**2
+    assert set(grid) <= set('abcdefghijklmnopqrstuvwxyz')
+    assert grid == create_grid(50, 1)
+    assert grid != create_grid(50, 2)
+
+
+def test_write_grid(tmp_path: 'Path') -> None:
+    path = tmp_path / 'grid.txt'  # type: Path
+    write_grid(path, 30, 1)
+
+    assert path.read_text().split() == [
+        create_grid(30, 1)[row*30:(row + 1)*30]
+        for row in range(30)
+    ]
+
+
+def test_find_present(benchmark) -> None:
+    found = benchmark(find_present, GRID_ARRAY, WORDS_MAP.keys())  # type: Set[str]
+
+    assert found == {
+        word
+        for word, expected in WORDS_MAP.items()
+        if expected
+    }
+
+
+@mark.parametrize('words, expected', (
+    (['cat', 'act', 'tac', 'dog'], {'cat', 'dog'}),
+    (['catdogs', 'dogscat', 'ogs'], {'catdogs', 'ogs'}),
+    (['', 'CAT', 'c'], {'c'}),
+))
+def test_find_present_rectangle(words: 'List[str]', expected: 'Set[str]') -> None:
+    grid = frombuffer(b'catdogs' b'axxxxxx' b'txxxxxx', dtype=uint8).reshape(3, 7)  # type: ndarray
+
+    assert find_present(grid, words) == expected
+
+
+def test_generate_words(benchmark) -> None:
+    words = benchmark(generate_words, GRID_ARRAY, 200, 1)  # type: Dict[str, bool]
+
+    assert any(words.values()) and not all(words.values())
+    assert words == generate_words(GRID_ARRAY, 200, 1)
+    assert all(
+        expected == any(word in line for line in LINES)
+        for word, expected in words.items()
+    )
+
+
+def test_generate_words_file() -> None:
+    assert generate_words(map_grid(GRID_FILE), 50, 1) == generate_words(GRID_ARRAY, 50, 1)
@@ -1,23 +1,33 @@
 from typing import TYPE_CHECKING
+from ctypes import c_long
+from multiprocessing import RawValue, get_all_start_methods, get_context
 
-from pytest import mark, raises
+from pytest import fixture, mark, raises
 
-from utils.grid import Grid, _GridWorker
+from utils import grid as grid_module
+from utils.grid import NGRAM_LENGTH, Grid, _GridWorker
+from utils.shared import SharedGrid
 
 from tests.data import GRID, ROW_LENGTH, WINDOW_SIZE, WORDS_MAP, WINDOW_WORDS
 
 
 if TYPE_CHECKING:
-    from typing import Tuple
+    from typing import Iterator, List, Set
 
-    from utils.grid import Axes
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from utils.backend import Cell
+    from utils.grid import NGrams
 
 
 GRID_INSTANCE = Grid(GRID, ROW_LENGTH, WINDOW_SIZE, False)  # type: Grid
-SHARED_AXES = tuple(
-    tuple(axis)
-    for axis in (GRID_INSTANCE._shared_rows, GRID_INSTANCE._shared_columns)
-)  # type: Tuple[Axes, ...]
+SHARED = SharedGrid.create(GRID_INSTANCE._lines, ROW_LENGTH, axes=2)  # type: SharedGrid
+
+
+@fixture(scope='module')
+def multiprocess_grid() -> 'Iterator[Grid]':
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, True) as grid:
+        yield grid
 
 
 def test__GridWorker_contains_word_unshared() -> None:
@@ -30,21 +40,19 @@ def test__GridWorker_share_data(benchmark) -> None:
     worker = _GridWorker()  # type: _GridWorker
     benchmark(
         worker.share_data,
-        rows=GRID_INSTANCE._shared_rows,
-        columns=GRID_INSTANCE._shared_columns,
+        grid=SHARED,
         window_size=GRID_INSTANCE._window_size,
     )
 
     assert worker._window_size == GRID_INSTANCE._window_size
-    assert worker._axes == SHARED_AXES
+    assert worker._grid is SHARED
 
 
 @mark.parametrize('word, expected', WINDOW_WORDS.items())
 def test__GridWorker_contains_word(benchmark, word: str, expected: bool) -> None:
     worker = _GridWorker()  # type: _GridWorker
     worker.share_data(
-        GRID_INSTANCE._shared_rows,
-        GRID_INSTANCE._shared_columns,
+        SHARED,
         GRID_INSTANCE._window_size,
     )
     result = benchmark(worker.contains_word, word=word, search_index=100)  # type: bool
@@ -52,17 +60,95 @@ def test__GridWorker_contains_word(benchmark, word: str, expected: bool) -> None
     assert result == expected
 
 
-def test_Grid__generate_rows(benchmark) -> None:
-    benchmark(GRID_INSTANCE._generate_rows, grid=GRID)
+@mark.parametrize('cancelled, expected', ((0, True), (1, False), (2, False)))
+def test__GridWorker_contains_word_cancelled(cancelled: int, expected: bool) -> None:
+    worker = _GridWorker()  # type: _GridWorker
+    worker.share_data(
+        SHARED,
+        GRID_INSTANCE._window_size,
+        RawValue(c_long, cancelled),
+    )
+    word = next(
+        word
+        for word, expected in WINDOW_WORDS.items()
+        if expected
+    )  # type: str
+
+    assert worker.contains_word(word=word, search_index=100, query=1) == expected
+    assert worker.contains_word(word=word, search_index=100)
+    worker.share_data(
+        SHARED,
+        GRID_INSTANCE._window_size,
+    )
+
+
+def test_Grid___init__(benchmark) -> None:
+    benchmark(Grid, GRID, ROW_LENGTH, WINDOW_SIZE, False)
+
+
+def test_Grid_rows() -> None:
+    assert [bytes(row).decode('ascii') for row in GRID_INSTANCE.rows] == [
+        GRID[row*ROW_LENGTH:(row + 1)*ROW_LENGTH]
+        for row in range(ROW_LENGTH)
+    ]
+
+
+def test_Grid_columns() -> None:
+    assert [bytes(column).decode('ascii') for column in GRID_INSTANCE.columns] == [
+        GRID[column::ROW_LENGTH]
+        for column in range(ROW_LENGTH)
+    ]
+
 
+@mark.parametrize('word, expected', (
+    ('ab', True),
+    ('cd', True),
+    ('ac', True),
+    ('bd', True),
+    ('bc', False),
+    ('dac', False),
+    ('', True),
+    ('é', False),
+))
+def test_Grid__linear_search_line_ends(word: str, expected: bool) -> None:
+    assert Grid('abcd', 2, 1, False)._linear_search(word) == expected
 
-def test_Grid__generate_columns(benchmark) -> None:
-    benchmark(GRID_INSTANCE._generate_columns)
 
+def test_Grid__generate_ngrams(benchmark) -> None:
+    result = benchmark(GRID_INSTANCE._generate_ngrams, grid=GRID.encode('ascii'))  # type: NGrams
 
-@mark.parametrize('axes', (GRID_INSTANCE.rows, GRID_INSTANCE.columns))
-def test_Grid__share_axes(benchmark, axes: 'Axes') -> None:
-    benchmark(GRID_INSTANCE._share_axes, axes=axes)
+    assert [len(table) for table in result] == [
+        (26**size + 7) // 8
+        for size in range(1, NGRAM_LENGTH + 1)
+    ]
+    assert result == GRID_INSTANCE._ngrams
+
+
+def test_Grid__generate_ngrams_non_letters() -> None:
+    assert Grid('ab-d', 2, 1, False)._ngrams is None
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_Grid__passes_filter(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(GRID_INSTANCE._passes_filter, word=word)  # type: bool
+
+    assert result or not expected
+
+
+@mark.parametrize('word, expected', (
+    ('', True),
+    ('a', True),
+    ('ab', True),
+    ('ac', True),
+    ('bd', True),
+    ('ba', False),
+    ('ad', False),
+    ('abd', False),
+    ('abdc', False),
+    ('aB', False),
+))
+def test_Grid__passes_filter_small(word: str, expected: bool) -> None:
+    assert Grid('abcd', 2, 1, False)._passes_filter(word) == expected
 
 
 @mark.parametrize('word, expected', WORDS_MAP.items())
@@ -73,14 +159,172 @@ def test_Grid__linear_search(benchmark, word: str, expected: bool) -> None:
 
 
 @mark.parametrize("word, expected", WORDS_MAP.items())
-def test_Grid__multiprocess_search(benchmark, word: str, expected: bool) -> None:
-    result = benchmark(GRID_INSTANCE._multiprocess_search, word=word)  # type: bool
+def test_Grid__multiprocess_search(
+            benchmark,
+            multiprocess_grid: Grid,
+            word: str,
+            expected: bool,
+        ) -> None:
+    result = benchmark(multiprocess_grid._multiprocess_search, word=word)  # type: bool
 
     assert result == expected
 
 
+def test_Grid__multiprocess_search_cancels() -> None:
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, True) as grid:
+        grid._ngrams = None
+        assert GRID[:ROW_LENGTH] in grid
+        assert grid._cancelled.value == grid._queries == 1
+        assert 'notaword' not in grid
+        assert grid._cancelled.value == grid._queries == 2
+
+
 @mark.parametrize("word, expected", WORDS_MAP.items())
 def test_Grid___contains__(benchmark, word: str, expected: bool) -> None:
     result = benchmark(GRID_INSTANCE.__contains__, word=word)  # type: bool
 
     assert result == expected
+
+
+def test_Grid_find_all(benchmark) -> None:
+    result = benchmark(GRID_INSTANCE.find_all, words=WORDS_MAP.keys())  # type: Set[str]
+
+    assert result == {
+        word
+        for word, expected in WORDS_MAP.items()
+        if expected
+    }
+
+
+def test__GridWorker_contains_words(benchmark) -> None:
+    worker = _GridWorker()  # type: _GridWorker
+    worker.share_data(
+        SHARED,
+        GRID_INSTANCE._window_size,
+    )
+    result = benchmark(
+        worker.contains_words,
+        words=tuple(WINDOW_WORDS),
+        search_index=100,
+    )  # type: Set[str]
+
+    assert result == {
+        word
+        for word, expected in WINDOW_WORDS.items()
+        if expected
+    }
+
+
+def test_Grid__multiprocess_find_all(benchmark, multiprocess_grid: Grid) -> None:
+    result = benchmark(multiprocess_grid._multiprocess_find_all, words=WORDS_MAP.keys())  # type: Set[str]
+
+    assert result == {
+        word
+        for word, expected in WORDS_MAP.items()
+        if expected
+    }
+
+
+def test_Grid_close() -> None:
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, True) as grid:
+        assert 'xryboxlexc' in grid
+        assert grid._pool is not None
+        assert grid._shared is not None
+        assert grid._lines.obj is grid._shared.buffer.obj
+
+    assert grid._pool is None
+    assert grid._shared is None
+    assert grid._lines == GRID_INSTANCE._lines
+    assert grid._linear_search('xryboxlexc')
+
+
+def test_Grid_serial_unshared() -> None:
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, False) as grid:
+        assert 'xryboxlexc' in grid
+        assert grid.find_all(WORDS_MAP.keys())
+        assert grid._shared is None
+
+
+def test__GridWorker_contains_word_line_ends() -> None:
+    worker = _GridWorker()  # type: _GridWorker
+    worker.share_data(SharedGrid.create(Grid('abcd', 2, 2, False)._lines, 2, axes=2), 2)
+
+    assert worker.contains_word('ab', 0)
+    assert worker.contains_word('bd', 0)
+    assert not worker.contains_word('bc', 0)
+    assert not worker.contains_word('ca', 0)
+    worker.share_data(SHARED, GRID_INSTANCE._window_size)
+
+
+@mark.parametrize('method', [
+    method
+    for method in ('spawn', 'forkserver')
+    if method in get_all_start_methods()
+])
+def test_Grid_start_methods(monkeypatch: 'MonkeyPatch', method: str) -> None:
+    monkeypatch.setattr(grid_module, 'Pool', get_context(method).Pool)
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, True) as grid:
+        grid._ngrams = None
+        assert grid.find_all(WORDS_MAP.keys()) == {
+            word
+            for word, expected in WORDS_MAP.items()
+            if expected
+        }
+
+        grid.apply_patch([(0, 0, 'z')])
+        assert 'z' + GRID[1:ROW_LENGTH] in grid
+        assert GRID[:ROW_LENGTH] not in grid
+
+
+PATCH = [(0, 0, 'z'), (5, 7, 'q'), (5, 8, 'q'), (999, 999, 'a'), (20, 3, 'm')]  # type: List[Cell]
+
+
+def _patched_grid(cells: 'List[Cell]') -> str:
+    letters = list(GRID)  # type: List[str]
+    for row, column, letter in cells:
+        letters[row*ROW_LENGTH + column] = letter
+
+    return ''.join(letters)
+
+
+@mark.parametrize('multiprocessing', (False, True))
+def test_Grid_apply_patch(benchmark, multiprocessing: bool) -> None:
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, multiprocessing) as grid:
+        assert GRID[:ROW_LENGTH] in grid
+        benchmark.pedantic(grid.apply_patch, args=(PATCH,), rounds=1, iterations=1)
+        expected = Grid(_patched_grid(PATCH), ROW_LENGTH, WINDOW_SIZE, False)  # type: Grid
+
+        assert grid.rows == expected.rows
+        assert grid.columns == expected.columns
+        assert grid._lines == expected._lines
+        if multiprocessing:
+            assert grid._shared.lines().tobytes() == bytes(grid._lines)
+        assert GRID[:ROW_LENGTH] not in grid
+        assert 'z' + GRID[1:ROW_LENGTH] in grid
+        assert GRID[5*ROW_LENGTH + 5:5*ROW_LENGTH + 7] + 'qq' in grid
+
+
+def test_Grid_set_cell_ngrams() -> None:
+    grid = Grid('ab' 'cd', 2, 1, False)  # type: Grid
+    assert 'e' not in grid
+
+    grid.set_cell(1, 1, 'e')
+    assert 'e' in grid
+    assert 'ce' in grid and 'be' in grid
+    assert 'd' not in grid
+
+
+@mark.parametrize('cell', ((2, 0, 'a'), (0, -1, 'a')))
+def test_Grid_apply_patch_outside(cell: 'Cell') -> None:
+    with raises(RuntimeError):
+        Grid('ab' 'cd', 2, 1, False).apply_patch([cell])
+
+
+@mark.parametrize('letter', ('', 'ab', 'é', 'A', '1', '-'))
+def test_Grid_apply_patch_invalid_letter(letter: str) -> None:
+    grid = Grid('ab' 'cd', 2, 1, False)  # type: Grid
+    with raises(ValueError):
+        grid.apply_patch([(0, 1, 'z'), (0, 0, letter)])
+
+    assert grid._ngrams is not None
+    assert grid.rows[0] == b'ab'
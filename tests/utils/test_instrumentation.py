@@ -0,0 +1,133 @@
+from typing import TYPE_CHECKING
+from json import loads
+from os import environ
+from pathlib import Path
+from subprocess import run
+from sys import executable
+
+from pytest import fixture, mark
+
+from utils import instrumentation
+from utils.files import read_grid
+from utils.grid import Grid
+from utils.instrumentation import (
+    ENVIRONMENT_VARIABLE,
+    disable,
+    enable,
+    phase,
+    progress,
+    report,
+    write_report,
+)
+
+from tests.data import GRID, GRID_FILE, ROW_LENGTH, WINDOW_SIZE
+
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator
+
+
+@fixture
+def enabled(tmp_path: 'Path') -> 'Iterator[Path]':
+    path = tmp_path / 'report.json'  # type: Path
+    enable(str(path))
+    try:
+        yield path
+    finally:
+        disable()
+
+
+def test_phase_disabled() -> None:
+    with phase('disabled', items=1) as counts:
+        counts['bytes'] = 1
+
+    assert report()['phases'] == {}
+
+
+def test_phase(enabled: 'Path') -> None:
+    for items in (1, 2):
+        with phase('test', items=items) as counts:
+            counts['bytes'] = 10
+
+    recorded = report()['phases']['test']  # type: Dict[str, int]
+    assert recorded['calls'] == 2
+    assert recorded['items'] == 3
+    assert recorded['bytes'] == 20
+    assert 0 <= recorded['max_seconds'] <= recorded['seconds']
+    assert recorded['peak_bytes'] > 0
+
+
+def test_phase_error(enabled: 'Path') -> None:
+    try:
+        with phase('error'):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert report()['phases']['error']['calls'] == 1
+
+
+def test_read_grid(enabled: 'Path') -> None:
+    assert read_grid(GRID_FILE) == GRID
+    assert report()['phases']['read_grid']['bytes'] == GRID_FILE.stat().st_size
+
+
+def test_progress(capsys, enabled: 'Path') -> None:
+    progress('shown')
+    disable()
+    progress('hidden')
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert captured.err == 'shown\n'
+
+
+def test_write_report(enabled: 'Path') -> None:
+    with phase('written'):
+        pass
+    write_report()
+
+    assert loads(enabled.read_text())['phases']['written']['calls'] == 1
+
+
+def test_environment_variable(tmp_path: 'Path') -> None:
+    path = tmp_path / 'report.json'  # type: Path
+    run(
+        [
+            executable,
+            '-c',
+            'from pathlib import Path; from utils.files import read_grid; '
+            'read_grid(Path({!r}))'.format(str(GRID_FILE)),
+        ],
+        env=dict(environ, **{ENVIRONMENT_VARIABLE: str(path)}),
+        check=True,
+    )
+
+    assert 'read_grid' in loads(path.read_text())['phases']
+    assert not instrumentation.enabled()
+
+
+@mark.parametrize('value', ('', '0', 'false', 'FALSE'))
+def test_environment_variable_disabled(tmp_path: 'Path', value: str) -> None:
+    result = run(
+        [executable, '-c', 'from utils.instrumentation import enabled; assert not enabled()'],
+        env=dict(
+            environ,
+            PYTHONPATH=str(Path(__file__).resolve().parents[2]),
+            **{ENVIRONMENT_VARIABLE: value}
+        ),
+        cwd=str(tmp_path),
+        capture_output=True,
+        check=True,
+    )
+
+    assert result.stderr == b''
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_grid_share(enabled: 'Path') -> None:
+    with Grid(GRID, ROW_LENGTH, WINDOW_SIZE, True) as grid:
+        assert 'grid.share' not in report()['phases']
+        assert 'xryboxlexc' in grid
+
+    assert report()['phases']['grid.share']['bytes'] == 2 * len(GRID)
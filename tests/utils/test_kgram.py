@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING
+
+from numpy import array_equal, memmap
+from pytest import mark, raises
+
+from utils.kgram import MAX_PACKED_LENGTH, KGramIndex
+
+from tests.data import GRID, MAX_WORD_LENGTH, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import List
+    from pathlib import Path
+
+    from utils.kgram import Table
+
+
+KGRAM_INSTANCE = KGramIndex(GRID, ROW_LENGTH, MAX_WORD_LENGTH)  # type: KGramIndex
+
+
+def test_KGramIndex___init___wrong_size() -> None:
+    with raises(RuntimeError):
+        KGramIndex(GRID[:-1], ROW_LENGTH, MAX_WORD_LENGTH)
+
+
+def test_KGramIndex___init___max_length() -> None:
+    index = KGramIndex(GRID[:100], 10, 24)  # type: KGramIndex
+
+    assert index._max_length == 10
+    assert len(index._tables) == 10
+    assert MAX_PACKED_LENGTH == 12
+
+
+def test_KGramIndex__pack_grid(benchmark) -> None:
+    result = benchmark(KGRAM_INSTANCE._pack_grid, grid=GRID.encode('ascii'))  # type: List[Table]
+
+    assert len(result) == MAX_WORD_LENGTH
+    assert len(result[0]) == 26
+    for table in result:
+        assert (table[1:] > table[:-1]).all()
+    assert KGRAM_INSTANCE._pack_word(GRID[:3]) in result[2]
+    assert KGRAM_INSTANCE._pack_word(GRID[0:3 * ROW_LENGTH:ROW_LENGTH]) in result[2]
+
+
+@mark.parametrize('word, expected', (
+    ('a', 1),
+    ('z', 26),
+    ('ab', 1 << 5 | 2),
+    ('A', -1),
+))
+def test_KGramIndex__pack_word(word: str, expected: int) -> None:
+    assert KGRAM_INSTANCE._pack_word(word) == expected
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_KGramIndex___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(KGRAM_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+@mark.parametrize('word, expected', (
+    ('', True),
+    (GRID[ROW_LENGTH - MAX_WORD_LENGTH:ROW_LENGTH], True),
+    (GRID[:MAX_WORD_LENGTH + 1], False),
+    ('aA', False),
+))
+def test_KGramIndex___contains___edges(word: str, expected: bool) -> None:
+    assert (word in KGRAM_INSTANCE) == expected
+
+
+def test_KGramIndex___init___index_dir(tmp_path: 'Path') -> None:
+    KGramIndex(GRID, ROW_LENGTH, MAX_WORD_LENGTH, tmp_path)
+    loaded = KGramIndex(GRID, ROW_LENGTH, MAX_WORD_LENGTH, tmp_path)  # type: KGramIndex
+
+    for table, expected in zip(loaded._tables, KGRAM_INSTANCE._tables):
+        assert isinstance(table, memmap)
+        assert array_equal(table, expected)
@@ -0,0 +1,103 @@
+from typing import TYPE_CHECKING
+from subprocess import check_output
+from sys import executable
+
+from pytest import mark, raises
+
+from utils.backend import Backend
+from utils.grid import Grid
+from utils.registry import (
+    BACKENDS,
+    BUILD_COSTS,
+    choose_backend,
+    create_backend,
+    estimate_cost,
+    load_backend,
+    register_backend,
+)
+
+from tests.data import GRID, ROW_LENGTH, WINDOW_SIZE
+
+
+if TYPE_CHECKING:
+    from typing import Tuple
+
+
+class FakeBackend(Backend):
+
+    def __init__(self, grid: str, axis_length: int) -> None:
+        self.grid = grid  # type: str
+        self.axis_length = axis_length  # type: int
+
+
+def test_import_is_lazy() -> None:
+    output = check_output([
+        executable,
+        '-c',
+        'import sys, utils, wordsearch; print(any('
+        'name == "numpy" or name in ("utils.grid", "utils.trie") for name in sys.modules))',
+    ])  # type: bytes
+
+    assert output.strip() == b'False'
+
+
+@mark.parametrize('name', sorted(BACKENDS))
+def test_load_backend(name: str) -> None:
+    assert issubclass(load_backend(name), Backend)
+
+
+def test_load_backend_unknown() -> None:
+    with raises(RuntimeError):
+        load_backend('missing')
+
+
+def test_register_backend() -> None:
+    register_backend('fake', __name__, 'FakeBackend', ('axis_length',))
+    try:
+        backend = create_backend('fake', 'abcd', axis_length=2, max_word=3)  # type: FakeBackend
+    finally:
+        del BACKENDS['fake']
+
+    assert isinstance(backend, FakeBackend)
+    assert (backend.grid, backend.axis_length) == ('abcd', 2)
+
+
+def test_create_backend(benchmark) -> None:
+    result = benchmark(
+        create_backend,
+        'grid',
+        GRID,
+        axis_length=ROW_LENGTH,
+        window_size=WINDOW_SIZE,
+        max_word=5,
+        multiprocessing=False,
+        index_dir=None,
+    )  # type: Backend
+
+    assert isinstance(result, Grid)
+
+
+@mark.parametrize('name', sorted(BUILD_COSTS))
+def test_estimate_cost(name: str) -> None:
+    serial, _ = estimate_cost(name, 10**6, 100, 5, 1)  # type: Tuple[float, bool]
+    parallel, _ = estimate_cost(name, 10**6, 100, 5, 8)  # type: Tuple[float, bool]
+
+    assert 0 < parallel <= serial
+
+
+@mark.parametrize('cells, words, max_word, memory, expected', (
+    (10**6, 1, 24, None, 'anchored'),
+    (10**6, 10**6, 5, None, 'trie'),
+    (10**6, 10**6, 12, None, 'kgram'),
+    (10**6, 10**6, 24, None, 'suffix_array'),
+    (10**6, 10**6, 24, 10**6, 'grid'),
+))
+def test_choose_backend(cells: int, words: int, max_word: int, memory: int, expected: str) -> None:
+    name, multiprocessing = choose_backend(cells, words, max_word, 1, memory)  # type: Tuple[str, bool]
+
+    assert name == expected
+    assert not multiprocessing
+
+
+def test_choose_backend_multiprocessing() -> None:
+    assert choose_backend(10**6, 10**6, 5, 8) == ('trie', True)
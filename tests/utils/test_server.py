@@ -0,0 +1,109 @@
+from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+from socket import AF_UNIX, SOCK_STREAM, socket
+from tempfile import mkdtemp
+from threading import Thread
+
+from pytest import mark
+
+from utils.server import FIND_ALL_THRESHOLD, QueryServer, _Batcher
+from wordsearch import WordSearch
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, List, Set
+
+
+WS = WordSearch(GRID, axis_length=ROW_LENGTH)  # type: WordSearch
+SOCKET = mkdtemp() + '/server.sock'  # type: str
+
+
+class CountingSearch:
+
+    def __init__(self) -> None:
+        self.calls = 0  # type: int
+
+    def is_present(self, word: str) -> bool:
+        self.calls += 1
+        return WS.is_present(word)
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        self.calls += 1
+        return WS.find_all(words)
+
+
+def _serve() -> QueryServer:
+    server = QueryServer(SOCKET, {'grid': WS, 'other': WS})  # type: QueryServer
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+SERVER = _serve()  # type: QueryServer
+
+
+def test_QueryServer_respond(benchmark) -> None:
+    result = benchmark(
+        SERVER.respond,
+        request={'grid': 'grid', 'words': list(WORDS_MAP)},
+    )  # type: Dict[str, Any]
+
+    assert result == {'found': list(WORDS_MAP.values())}
+
+
+@mark.parametrize('request_', (
+    {'words': ['a']},
+    {'grid': 'missing', 'words': ['a']},
+    {'grid': 'grid', 'words': 'a'},
+    {'grid': 'grid', 'words': [1]},
+))
+def test_QueryServer_respond_invalid(request_: 'Dict[str, Any]') -> None:
+    assert 'error' in SERVER.respond(request_)
+
+
+def test_QueryServer_respond_single_grid() -> None:
+    server = QueryServer(mkdtemp() + '/single.sock', {'grid': WS})  # type: QueryServer
+    try:
+        assert server.respond({'words': ['xryboxlexc']}) == {'found': [True]}
+    finally:
+        server.server_close()
+
+
+@mark.parametrize('amount', (1, FIND_ALL_THRESHOLD))
+def test__Batcher_query_batches(amount: int) -> None:
+    search = CountingSearch()  # type: CountingSearch
+    batcher = _Batcher(search, 0.2)  # type: _Batcher
+    words = list(WORDS_MAP)[:amount]  # type: List[str]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(
+            lambda _: batcher.query(words).found,
+            range(8),
+        ))
+
+    expected = {word for word in words if WORDS_MAP[word]}  # type: Set[str]
+    assert all(result == expected for result in results)
+    assert search.calls == 1
+
+
+@mark.parametrize('line', (b'not json\n', b'["a"]\n', b'"a"\n', b'\xff\n'))
+def test_QueryServer_malformed_line(line: bytes) -> None:
+    with socket(AF_UNIX, SOCK_STREAM) as connection:
+        connection.connect(SOCKET)
+        file = connection.makefile('rwb')
+        file.write(line)
+        file.write(dumps({'grid': 'grid', 'words': ['xryboxlexc']}).encode('utf-8') + b'\n')
+        file.flush()
+
+        assert 'error' in loads(file.readline().decode('utf-8'))
+        assert loads(file.readline().decode('utf-8')) == {'found': [True]}
+        file.close()
+
+
+def test__Batcher_query_error() -> None:
+    batcher = _Batcher(None, 0)  # type: ignore
+
+    assert batcher.query(['a']).error
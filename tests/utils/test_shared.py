@@ -0,0 +1,53 @@
+from gc import collect
+from multiprocessing.shared_memory import SharedMemory
+from pickle import dumps, loads
+
+from pytest import raises
+
+from utils.shared import SharedGrid
+
+from tests.data import GRID, ROW_LENGTH
+
+
+def test_SharedGrid_create(benchmark) -> None:
+    result = benchmark(SharedGrid.create, grid=GRID, axis_length=ROW_LENGTH)  # type: SharedGrid
+
+    assert result.lines().tobytes() == GRID.encode('ascii')
+
+
+def test_SharedGrid_create_columns() -> None:
+    shared = SharedGrid.create(b'abcd' b'acbd', 2, axes=2)  # type: SharedGrid
+
+    assert [line.tobytes() for line in shared.lines()] == [b'ab', b'cd', b'ac', b'bd']
+
+
+def test_SharedGrid_set_cell() -> None:
+    shared = SharedGrid.create(b'abcd' b'acbd', 2, axes=2)  # type: SharedGrid
+    shared.set_cell(0, 1, 'z')
+
+    assert bytes(shared.buffer[:8]) == b'azcd' b'aczd'
+
+
+def test_SharedGrid_attach() -> None:
+    shared = SharedGrid.create(b'abcd' b'acbd', 2, axes=2)  # type: SharedGrid
+    attached = loads(dumps(shared))  # type: SharedGrid
+    attached.set_cell(1, 0, 'z')
+
+    assert attached.name == shared.name
+    assert attached.axes == 2
+    assert bytes(shared.buffer[:8]) == b'abzd' b'azbd'
+
+
+def test_SharedGrid_release() -> None:
+    shared = SharedGrid.create(b'abcd', 2)  # type: SharedGrid
+    name = shared.name  # type: str
+    attached = SharedGrid.attach(name, 2, 1)  # type: SharedGrid
+
+    del attached
+    collect()
+    SharedMemory(name).close()
+
+    del shared
+    collect()
+    with raises(FileNotFoundError):
+        SharedMemory(name)
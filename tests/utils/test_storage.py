@@ -0,0 +1,70 @@
+from typing import TYPE_CHECKING
+from pathlib import Path
+
+from numpy import arange, array_equal, memmap
+
+from utils.storage import FORMAT_VERSION, index_path, load_index, save_index
+
+from tests.data import GRID
+
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from utils.storage import Arrays
+
+
+ARRAYS = {
+    'first': arange(10),
+    'second': arange(12).reshape(3, 4),
+}  # type: Arrays
+
+
+def test_index_path(benchmark, tmp_path: Path) -> None:
+    result = benchmark(index_path, directory=tmp_path, kind='test', grid=GRID, size=5)  # type: Path
+
+    assert result.parent == tmp_path
+    assert result.name.startswith('test-v{}-'.format(FORMAT_VERSION))
+    assert result == index_path(tmp_path, 'test', GRID.encode('ascii'), size=5)
+    assert result != index_path(tmp_path, 'test', GRID, size=6)
+    assert result != index_path(tmp_path, 'other', GRID, size=5)
+    assert result != index_path(tmp_path, 'test', GRID[::-1], size=5)
+
+
+def test_load_index_missing(tmp_path: Path) -> None:
+    assert load_index(tmp_path / 'missing', ARRAYS.keys()) is None
+
+
+def test_save_index(tmp_path: Path) -> None:
+    path = tmp_path / 'nested' / 'index'  # type: Path
+    save_index(path, ARRAYS)
+
+    assert sorted(child.name for child in path.parent.iterdir()) == ['index']
+    result = load_index(path, ARRAYS.keys())  # type: Optional[Arrays]
+    assert result is not None
+    for name, array in ARRAYS.items():
+        assert isinstance(result[name], memmap)
+        assert array_equal(result[name], array)
+
+
+def test_save_index_existing(tmp_path: Path) -> None:
+    path = tmp_path / 'index'  # type: Path
+    save_index(path, ARRAYS)
+    save_index(path, {'first': arange(3)})
+
+    result = load_index(path, ('first',))  # type: Optional[Arrays]
+    assert result is not None
+    assert array_equal(result['first'], ARRAYS['first'])
+    assert [child.name for child in tmp_path.iterdir()] == ['index']
+
+
+def test_save_index_incomplete(tmp_path: Path) -> None:
+    path = tmp_path / 'index'  # type: Path
+    save_index(path, {'first': arange(3)})
+    save_index(path, ARRAYS)
+
+    result = load_index(path, ARRAYS.keys())  # type: Optional[Arrays]
+    assert result is not None
+    for name, array in ARRAYS.items():
+        assert array_equal(result[name], array)
+    assert [child.name for child in tmp_path.iterdir()] == ['index']
@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING
+
+from numpy import array_equal, memmap
+from pytest import mark, raises
+
+from utils.suffix import SuffixArray
+from utils.text import separated_lines
+
+from tests.data import GRID, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from utils.suffix import Suffixes, Text
+
+
+SUFFIX_INSTANCE = SuffixArray(GRID, ROW_LENGTH)  # type: SuffixArray
+TEXT = separated_lines(GRID, ROW_LENGTH)  # type: Text
+
+
+def test_SuffixArray___init___wrong_size() -> None:
+    with raises(RuntimeError):
+        SuffixArray(GRID[:-1], ROW_LENGTH)
+
+
+def test_SuffixArray__sort_suffixes(benchmark) -> None:
+    result = benchmark(SUFFIX_INSTANCE._sort_suffixes, text=TEXT[:5000])  # type: Suffixes
+    text = TEXT[:5000].tobytes()  # type: bytes
+
+    assert sorted(result.tolist()) == list(range(5000))
+    assert [text[start:] for start in result] == sorted(
+        text[start:]
+        for start in range(5000)
+    )
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_SuffixArray___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(SUFFIX_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+@mark.parametrize('word, expected', (
+    (GRID[:ROW_LENGTH], True),
+    (GRID[ROW_LENGTH - 1::ROW_LENGTH], True),
+    (GRID[ROW_LENGTH - 5:ROW_LENGTH + 5], False),
+    ('ab\nc', False),
+    ('é', False),
+))
+def test_SuffixArray___contains___edges(word: str, expected: bool) -> None:
+    assert (word in SUFFIX_INSTANCE) == expected
+
+
+@mark.parametrize('word, expected', (
+    ('acc', True),
+    ('ac', True),
+    ('bcc', True),
+    ('cab', False),
+))
+def test_SuffixArray___contains___small_grid(word: str, expected: bool) -> None:
+    assert (word in SuffixArray(b'bcccbcacc', 3)) == expected
+
+
+def test_SuffixArray___init___index_dir(tmp_path: 'Path') -> None:
+    built = SuffixArray(GRID, ROW_LENGTH, tmp_path)  # type: SuffixArray
+    loaded = SuffixArray(GRID, ROW_LENGTH, tmp_path)  # type: SuffixArray
+
+    assert isinstance(loaded._suffixes, memmap)
+    assert array_equal(loaded._suffixes, built._suffixes)
+    assert array_equal(loaded._suffixes, SUFFIX_INSTANCE._suffixes)
@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING
+
+from numpy import arange, empty, ndarray, uint8
+from pytest import mark
+
+from utils import text as text_module
+from utils.text import SEPARATOR, joined_lines, separated_lines, transpose
+
+from tests.data import GRID, ROW_LENGTH
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+@mark.parametrize('block', (1, 3, 64))
+def test_transpose(monkeypatch: 'MonkeyPatch', block: int) -> None:
+    monkeypatch.setattr(text_module, 'TRANSPOSE_BLOCK_SIZE', block)
+    rows = arange(7 * 7, dtype=uint8).reshape(7, 7)  # type: ndarray
+    columns = empty((7, 7), dtype=uint8)  # type: ndarray
+    transpose(rows, columns)
+
+    assert (columns == rows.T).all()
+
+
+def test_joined_lines(benchmark) -> None:
+    result = benchmark(joined_lines, grid=GRID, axis_length=ROW_LENGTH)  # type: bytearray
+
+    assert isinstance(result, bytearray)
+    assert len(result) == 2 * ROW_LENGTH**2
+    assert result[:ROW_LENGTH].decode('ascii') == GRID[:ROW_LENGTH]
+    assert result[-ROW_LENGTH:].decode('ascii') == GRID[ROW_LENGTH - 1::ROW_LENGTH]
+
+
+def test_joined_lines_bytes() -> None:
+    assert joined_lines(b'abcd', 2) == b'abcd' b'acbd'
+
+
+def test_separated_lines(benchmark) -> None:
+    result = benchmark(separated_lines, grid=GRID, axis_length=ROW_LENGTH)  # type: ndarray
+
+    assert isinstance(result, ndarray)
+    assert len(result) == 2 * ROW_LENGTH * (ROW_LENGTH + 1)
+    assert result[ROW_LENGTH] == SEPARATOR
+    assert result[:ROW_LENGTH].tobytes().decode('ascii') == GRID[:ROW_LENGTH]
+    assert result[-ROW_LENGTH - 1:-1].tobytes().decode('ascii') == GRID[ROW_LENGTH - 1::ROW_LENGTH]
+
+
+def test_separated_lines_bytes() -> None:
+    assert separated_lines(b'abcd', 2).tobytes() == b'ab\ncd\nac\nbd\n'
@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+
+from pytest import mark, raises
+
+from utils.tiles import TiledGrid, map_grid
+
+from tests.data import GRID, GRID_FILE, MAX_WORD_LENGTH, ROW_LENGTH, WORDS_MAP
+
+
+if TYPE_CHECKING:
+    from typing import List, Set
+    from pathlib import Path
+
+    from numpy import ndarray
+
+
+TILED_INSTANCE = TiledGrid(GRID_FILE, 24, tile_size=256)  # type: TiledGrid
+ROWS = ['abcdefg', 'hijklmn', 'opqrstu']  # type: List[str]
+
+
+def _rectangle_words() -> 'List[str]':
+    columns = [''.join(column) for column in zip(*ROWS)]  # type: List[str]
+
+    return [
+        line[start:start + length]
+        for line in ROWS + columns
+        for length in range(1, 4)
+        for start in range(len(line) - length + 1)
+    ]
+
+
+@mark.parametrize('contents, width', (
+    ('\n'.join(ROWS) + '\n', None),
+    ('\n'.join(ROWS), None),
+    ('\r\n'.join(ROWS) + '\r\n', None),
+    (''.join(ROWS), len(ROWS[0])),
+))
+def test_map_grid(tmp_path: 'Path', contents: str, width: int) -> None:
+    path = tmp_path / 'grid.txt'  # type: Path
+    path.write_bytes(contents.encode('ascii'))
+    grid = map_grid(path, width)  # type: ndarray
+
+    assert grid.shape == (len(ROWS), len(ROWS[0]))
+    assert [row.tobytes().decode('ascii') for row in grid] == ROWS
+
+
+def test_map_grid_square() -> None:
+    grid = map_grid(GRID_FILE)  # type: ndarray
+
+    assert grid.shape == (ROW_LENGTH, ROW_LENGTH)
+    assert grid.tobytes().decode('ascii') == GRID
+
+
+@mark.parametrize('contents', (b'', b'abcde'))
+def test_TiledGrid___init___invalid(tmp_path: 'Path', contents: bytes) -> None:
+    path = tmp_path / 'grid.txt'  # type: Path
+    path.write_bytes(contents)
+    with raises(RuntimeError):
+        TiledGrid(path, MAX_WORD_LENGTH)
+
+
+@mark.parametrize('tile_size', (1, 2, 5, 100))
+def test_TiledGrid_rectangle(tmp_path: 'Path', tile_size: int) -> None:
+    path = tmp_path / 'grid.txt'  # type: Path
+    path.write_text('\n'.join(ROWS))
+    tiled = TiledGrid(path, 3, tile_size=tile_size)  # type: TiledGrid
+    words = _rectangle_words()  # type: List[str]
+
+    assert all(word in tiled for word in words)
+    assert tiled.find_all(words + ['gh', 'ba', 'abcd']) == set(words)
+    assert 'gh' not in tiled
+    assert 'abcd' not in tiled
+
+
+@mark.parametrize('word, expected', WORDS_MAP.items())
+def test_TiledGrid___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(TILED_INSTANCE.__contains__, word=word)  # type: bool
+
+    assert result == expected
+
+
+def test_TiledGrid_find_all(benchmark) -> None:
+    result = benchmark(TILED_INSTANCE.find_all, words=WORDS_MAP.keys())  # type: Set[str]
+
+    assert result == {
+        word
+        for word, expected in WORDS_MAP.items()
+        if expected
+    }
@@ -1,10 +1,12 @@
 from typing import TYPE_CHECKING
-from ctypes import Array
+from multiprocessing import get_all_start_methods, get_context
 
-from numpy import ndarray, asarray
+from numpy import array_equal, memmap, asarray, full, uint8
 from pytest import mark, raises
 
-from utils.trie import Trie, _TrieDict, _TrieWorker
+from utils import trie as trie_module
+from utils.shared import SharedGrid
+from utils.trie import END, FIRST_LETTER, Trie, _TrieArray, _TrieWorker
 
 from tests.data import (
     GRID,
@@ -19,9 +21,14 @@ from tests.data import (
 
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, List
+    from typing import Any, Dict, List, Tuple, Type
+    from pathlib import Path
 
-    from utils.trie import SharedGridArray, Grid
+    from _pytest.monkeypatch import MonkeyPatch
+    from numpy import ndarray
+
+    from utils.backend import Cell
+    from utils.trie import CountedEdges, Sequences
 
 
 TRIE_INSTANCE = Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, True)  # type: Trie
@@ -33,47 +40,123 @@ class FakePool:
         self._pool = [0]*pool_length  # type List[int]
 
 
-def _make_np_array(array: 'List[str]') -> 'Grid':
-    return asarray(array, dtype=TRIE_INSTANCE._dtype).flatten()  # type: Grid
+def _make_sequences(words: 'List[List[str]]') -> 'Sequences':
+    width = max([MAX_WORD_LENGTH] + [len(word) for word in words])  # type: int
+    sequences = full((len(words), width), END, dtype=uint8)  # type: Sequences
+    for row, word in enumerate(words):
+        sequences[row, :len(word)] = [
+            ord(character) - FIRST_LETTER
+            for character in word
+        ]
+
+    return sequences
+
+
+def _as_dict(trie: _TrieArray, node: int = 0) -> 'Dict[str, Any]':
+    return {
+        chr(FIRST_LETTER + code): _as_dict(trie, child)
+        for code, child in enumerate(trie._children[node].tolist())
+        if child
+    }
+
+
+def _counts(trie: _TrieArray, node: int = 0, prefix: str = '') -> 'Dict[str, int]':
+    counts = {}  # type: Dict[str, int]
+    for code, child in enumerate(trie._children[node].tolist()):
+        if child:
+            word = prefix + chr(FIRST_LETTER + code)  # type: str
+            counts[word] = trie._counts.item(child)
+            counts.update(_counts(trie, child, word))
+
+    return counts
 
 
 POOL = FakePool(10)  # type: FakePool
 RANGES = range(0, TRIE_INSTANCE._axis_length, WINDOW_SIZE)  # type: range
 
 
-trie_instance = _TrieDict()  # type: _TrieDict
-@mark.parametrize('array, expected', TRIES)
-def test__TrieDict_add_children(benchmark, array: 'List[str]', expected: 'Dict[str, Any]') -> None:
-    benchmark(trie_instance.add_children, children=_make_np_array(array))
+@mark.parametrize('index, expected', list(enumerate(expected for _, expected in TRIES)))
+def test__TrieArray_from_sequences(benchmark, index: int, expected: 'Dict[str, Any]') -> None:
+    sequences = _make_sequences([
+        array
+        for array, _ in TRIES[:index + 1]
+    ])  # type: Sequences
+    result = benchmark(_TrieArray.from_sequences, sequences=sequences)  # type: _TrieArray
+
+    assert _as_dict(result) == expected
+
+
+def test__TrieArray_from_sequences_empty() -> None:
+    result = _TrieArray.from_sequences(_make_sequences([]))  # type: _TrieArray
+
+    assert len(result) == 1
+    assert _as_dict(result) == {}
+
+
+def test__TrieArray_counts() -> None:
+    result = _TrieArray.from_sequences(_make_sequences(['ab', 'ab', 'ac', 'b']))  # type: _TrieArray
+    children = result._children  # type: ndarray
+    a = children.item(0, 0)  # type: int
+
+    assert result._counts.item(a) == 3
+    assert result._counts.item(children.item(a, 1)) == 2
+    assert result._counts.item(children.item(a, 2)) == 1
+    assert result._counts.item(children.item(0, 1)) == 1
 
-    assert trie_instance == expected
 
+def test__TrieArray_add_remove() -> None:
+    result = _TrieArray.from_sequences(_make_sequences(['ab', 'ac']))  # type: _TrieArray
+    result.remove([0, 1])
+    result.add([1, 3, 3])
+    result.add([0, 3])
 
-trie_instance = _TrieDict()  # type: _TrieDict
-@mark.parametrize('array, expected', TRIES)
-def test__TrieDict__add_child(benchmark, array: 'List[str]', expected: 'Dict[str, Any]') -> None:
-    np = _make_np_array(array)  # type: Grid
-    benchmark(trie_instance._add_child, character=np[0], children=np[1:])
+    assert _as_dict(result) == _as_dict(
+        _TrieArray.from_sequences(_make_sequences(['ac', 'bdd', 'ad']))
+    )
+    assert len(result) == 7
+
+    result.remove([0, 2])
+    result.remove([0, 3])
 
-    assert trie_instance == expected
+    assert _as_dict(result) == {'b': {'d': {'d': {}}}}
+    assert len(result) == 4
 
 
-def test__TrieDict___or__(benchmark) -> None:
-    trie1, trie2 = _TrieDict(), _TrieDict()
-    trie1.add_children(_make_np_array(TRIES[0][0]))
-    trie2.add_children(_make_np_array(TRIES[1][0]))
-    result = benchmark(trie1.__or__, other=trie2)  # type: _TrieDict
+def test__TrieArray_join(benchmark) -> None:
+    tries = [
+        _TrieArray.edges(_make_sequences(words))
+        for words in (['abc', 'ad'], ['bc'], ['cab', 'c'])
+    ]  # type: List[CountedEdges]
+    result = benchmark(_TrieArray.join, tries=tries)  # type: _TrieArray
+    expected = _TrieArray.from_sequences(
+        _make_sequences(['abc', 'ad', 'bc', 'cab', 'c'])
+    )  # type: _TrieArray
 
-    assert result == TRIES[1][1]
+    assert _as_dict(result) == _as_dict(expected)
+    assert _counts(result) == _counts(expected)
+
+
+def test__TrieArray_join_shared_letter() -> None:
+    tries = [
+        _TrieArray.edges(_make_sequences(words))
+        for words in (['ab'], ['ac'])
+    ]  # type: List[CountedEdges]
+    with raises(RuntimeError):
+        _TrieArray.join(tries)
 
 
 @mark.parametrize('word, expected', WORDS_MAP.items())
-def test__TrieDict___contains__(benchmark, word: str, expected: bool) -> None:
-    result = benchmark(TRIE_INSTANCE._root.__contains__, word=list(word))  # type: bool
+def test__TrieArray___contains__(benchmark, word: str, expected: bool) -> None:
+    result = benchmark(TRIE_INSTANCE._root.__contains__, word=word)  # type: bool
 
     assert result == expected
 
 
+@mark.parametrize('word', ('A', 'ab-', 'a' * (MAX_WORD_LENGTH + 1)))
+def test__TrieArray___contains___invalid(word: str) -> None:
+    assert word not in TRIE_INSTANCE._root
+
+
 def test__TrieWorker_iterate_window_unshared() -> None:
     worker = _TrieWorker()  # type: _TrieWorker
     with raises(RuntimeError):
@@ -85,39 +168,41 @@ def test__TrieWorker_share_data(benchmark) -> None:
     benchmark(
         worker.share_data,
         grid=TRIE_INSTANCE._grid,
-        shape=TRIE_INSTANCE._shape,
-        dtype=TRIE_INSTANCE._dtype,
         window_size=WINDOW_SIZE,
-        axis_length=TRIE_INSTANCE._axis_length,
         max_word_length=MAX_WORD_LENGTH,
     )
 
     assert worker._max_word_length == MAX_WORD_LENGTH
     assert worker._axis_length == TRIE_INSTANCE._axis_length
     assert worker._window_size == WINDOW_SIZE
-    assert worker._dtype == TRIE_INSTANCE._dtype
-    assert worker._shape == TRIE_INSTANCE._shape
-    assert worker._grid == TRIE_INSTANCE._grid
+    assert worker._grid is TRIE_INSTANCE._grid
 
 
 def test__TrieWorker_iterate_window(benchmark) -> None:
     worker = _TrieWorker()  # type: _TrieWorker
-    result = benchmark(worker.iterate_window, ranges=(10, 10))  # type: _TrieDict
+    result = benchmark(worker.iterate_window, ranges=(10, 10))  # type: Sequences
 
-    assert result == TRIE_NODE
+    assert result.shape == (2 * WINDOW_SIZE**2, MAX_WORD_LENGTH)
+    assert _as_dict(_TrieArray.from_sequences(result)) == TRIE_NODE
 
 
-def test_Trie__load_grid(benchmark) -> None:
-    result = benchmark(TRIE_INSTANCE._load_grid, grid=GRID)  # type: SharedGridArray
+def test__TrieWorker_fill_letters(benchmark) -> None:
+    worker = _TrieWorker()  # type: _TrieWorker
+    first_letters = tuple(range(0, 26, 2))  # type: Tuple[int, ...]
+    result = benchmark(worker.fill_letters, first_letters=first_letters)  # type: CountedEdges
 
-    assert isinstance(result, Array)
+    assert _as_dict(_TrieArray.from_edges(result)) == {
+        letter: node
+        for letter, node in GRID_TRIE.items()
+        if (ord(letter) - FIRST_LETTER) % 2 == 0
+    }
 
 
-def test_Trie__format_grid(benchmark) -> None:
-    size = TRIE_INSTANCE._axis_length**2
-    result = benchmark(TRIE_INSTANCE._format_grid, grid=GRID, size=size)  # type: Grid
+def test_Trie__load_grid(benchmark) -> None:
+    result = benchmark(TRIE_INSTANCE._load_grid, grid=GRID)  # type: SharedGrid
 
-    assert isinstance(result, ndarray)
+    assert isinstance(result, SharedGrid)
+    assert result.lines().tobytes() == GRID.encode('ascii')
 
 
 def test_Trie__non_linear_fill(benchmark) -> None:
@@ -125,18 +210,30 @@ def test_Trie__non_linear_fill(benchmark) -> None:
         TRIE_INSTANCE._non_linear_fill,
         window_size=WINDOW_SIZE,
         max_word=MAX_WORD_LENGTH,
-    )  # type: _TrieDict
+    )  # type: _TrieArray
+
+    assert _as_dict(result) == GRID_TRIE
 
-    assert result == GRID_TRIE
+
+@mark.parametrize('method', [
+    method
+    for method in ('spawn', 'forkserver')
+    if method in get_all_start_methods()
+])
+def test_Trie__non_linear_fill_start_methods(monkeypatch: 'MonkeyPatch', method: str) -> None:
+    monkeypatch.setattr(trie_module, 'Pool', get_context(method).Pool)
+    result = TRIE_INSTANCE._non_linear_fill(WINDOW_SIZE, MAX_WORD_LENGTH)  # type: _TrieArray
+
+    assert _as_dict(result) == GRID_TRIE
 
 
 def test_Trie__linear_fill(benchmark) -> None:
     result = benchmark(
         TRIE_INSTANCE._linear_fill,
         max_word=MAX_WORD_LENGTH,
-    )  # type: _TrieDict
+    )  # type: _TrieArray
 
-    assert result == GRID_TRIE
+    assert _as_dict(result) == GRID_TRIE
 
 
 def test_Trie__calculate_chunks(benchmark) -> None:
@@ -145,8 +242,93 @@ def test_Trie__calculate_chunks(benchmark) -> None:
     assert result == 1
 
 
+@mark.parametrize('groups', (1, 4, 30))
+def test_Trie__partition_letters(benchmark, groups: int) -> None:
+    result = benchmark(TRIE_INSTANCE._partition_letters, groups=groups)  # type: List[Tuple[int, ...]]
+    letters = [
+        letter
+        for group in result
+        for letter in group
+    ]  # type: List[int]
+
+    assert len(result) <= min(groups, 26)
+    assert len(letters) == len(set(letters))
+    assert set(letters) == {ord(letter) - FIRST_LETTER for letter in GRID}
+
+
 @mark.parametrize('word, expected', WORDS_MAP.items())
 def test_Trie___contains__(benchmark, word: str, expected: bool) -> None:
     result = benchmark(TRIE_INSTANCE.__contains__, word=word)  # type: bool
 
     assert result == expected
+
+
+def test__TrieWorker_clear_data() -> None:
+    worker = _TrieWorker()  # type: _TrieWorker
+    worker.share_data(TRIE_INSTANCE._grid, WINDOW_SIZE, MAX_WORD_LENGTH)
+    worker.clear_data()
+
+    with raises(RuntimeError):
+        worker.iterate_window(ranges=(10, 10))
+
+
+def test_Trie___init___index_dir(tmp_path: 'Path') -> None:
+    built = Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, False, tmp_path)  # type: Trie
+    loaded = Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, False, tmp_path)  # type: Trie
+
+    assert isinstance(loaded._root._children, memmap)
+    assert array_equal(loaded._root._children, built._root._children)
+
+
+def test_Trie___init___incomplete_index(tmp_path: 'Path') -> None:
+    Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, False, tmp_path)
+    index, = tmp_path.iterdir()
+    (index / 'counts.npy').unlink()
+
+    Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, False, tmp_path)
+    loaded = Trie(GRID, ROW_LENGTH, WINDOW_SIZE, MAX_WORD_LENGTH, False, tmp_path)  # type: Trie
+
+    assert (index / 'counts.npy').is_file()
+    assert isinstance(loaded._root._counts, memmap)
+
+
+def _patched_grid(cells: 'List[Cell]', length: int) -> str:
+    letters = list(GRID[:length**2])  # type: List[str]
+    for row, column, letter in cells:
+        letters[row*length + column] = letter
+
+    return ''.join(letters)
+
+
+PATCH = [(0, 0, 'z'), (5, 7, 'q'), (5, 8, 'q'), (39, 39, 'a'), (20, 3, 'm'), (20, 3, 'n')]  # type: List[Cell]
+
+
+@mark.parametrize('multiprocessing', (False, True))
+def test_Trie_apply_patch(benchmark, multiprocessing: bool) -> None:
+    trie = Trie(GRID[:40**2], 40, 20, MAX_WORD_LENGTH, multiprocessing)  # type: Trie
+    benchmark.pedantic(trie.apply_patch, args=(PATCH,), rounds=1, iterations=1)
+    expected = Trie(_patched_grid(PATCH, 40), 40, 20, MAX_WORD_LENGTH, False)  # type: Trie
+
+    assert _counts(trie._root) == _counts(expected._root)
+    assert len(trie._root) == len(expected._root)
+
+
+def test_Trie_set_cell_index_dir(tmp_path: 'Path') -> None:
+    Trie(GRID[:40**2], 40, 20, MAX_WORD_LENGTH, False, tmp_path)
+    loaded = Trie(GRID[:40**2], 40, 20, MAX_WORD_LENGTH, False, tmp_path)  # type: Trie
+    loaded.set_cell(10, 10, 'z')
+    expected = Trie(_patched_grid([(10, 10, 'z')], 40), 40, 20, MAX_WORD_LENGTH, False)  # type: Trie
+
+    assert _counts(loaded._root) == _counts(expected._root)
+
+
+@mark.parametrize('cell, error', (
+    ((40, 0, 'a'), RuntimeError),
+    ((0, -1, 'a'), RuntimeError),
+    ((0, 0, 'ab'), ValueError),
+    ((0, 0, 'A'), ValueError),
+))
+def test_Trie_apply_patch_invalid(cell: 'Cell', error: 'Type[Exception]') -> None:
+    trie = Trie(GRID[:40**2], 40, 20, MAX_WORD_LENGTH, False)  # type: Trie
+    with raises(error):
+        trie.apply_patch([cell])
@@ -1,3 +1,33 @@
-from utils.files import read_grid, read_words
-from utils.grid import Grid
-from utils.trie import Trie
\ No newline at end of file
+from typing import TYPE_CHECKING
+from importlib import import_module
+
+from utils.cache import LRUCache
+from utils.files import iter_words, read_grid, read_grid_bytes, read_words, write_results
+from utils.registry import BACKENDS, choose_backend, create_backend, load_backend
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict
+
+    from utils.anchor import AnchoredGrid
+    from utils.bitset import BitGrid
+    from utils.directions import DirectionalGrid
+    from utils.grid import Grid
+    from utils.kgram import KGramIndex
+    from utils.suffix import SuffixArray
+    from utils.tiles import TiledGrid
+    from utils.trie import Trie
+
+
+_LAZY_ATTRIBUTES = {
+    attribute: module
+    for module, attribute, _ in BACKENDS.values()
+}  # type: Dict[str, str]
+
+
+def __getattr__(name: str) -> 'Any':
+    """ Import backends only when they're first used. """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
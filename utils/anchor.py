@@ -0,0 +1,143 @@
+from typing import TYPE_CHECKING
+
+from numpy import argsort, bincount, concatenate, cumsum, frombuffer, int32, int64, uint8
+
+from utils.backend import Backend
+from utils.directions import DIRECTIONS
+from utils.instrumentation import progress
+
+
+if TYPE_CHECKING:
+    from typing import Iterable, List, Optional, Tuple
+
+    from numpy import ndarray
+
+    from utils.backend import Location
+    from utils.directions import Direction
+    from utils.files import GridData
+
+    Starts = ndarray
+
+
+class AnchoredGrid(Backend):
+    locates = True  # type: bool
+
+    def __init__(
+                self,
+                grid: 'GridData',
+                axis_length: int,
+                directions: 'Iterable[str]' = ('right', 'down'),
+            ) -> None:
+        self._axis_length = axis_length  # type: int
+        self._names = tuple(directions)  # type: Tuple[str, ...]
+        self._directions = tuple(
+            DIRECTIONS[direction]
+            for direction in self._names
+        )  # type: Tuple[Direction, ...]
+
+        progress('Indexing letters: ...', end='\r')
+        if len(grid) != self._axis_length**2:
+            raise RuntimeError('grid is not the right size!')
+        if isinstance(grid, str):
+            grid = grid.encode('ascii')
+
+        self._grid = frombuffer(grid, dtype=uint8)  # type: ndarray
+        self._counts = bincount(self._grid, minlength=256)  # type: ndarray
+        self._offsets = concatenate(([0], cumsum(self._counts)))  # type: ndarray
+        self._positions = self._index_letters()  # type: ndarray
+        progress('Indexing letters: DONE')
+
+    def _index_letters(self) -> 'ndarray':
+        """ Sort the position of every cell by its letter.
+
+        The positions of a letter are then the slice between its offsets,
+        in the order they appear in the grid.
+        """
+        dtype = int32 if len(self._grid) < 2**31 else int64
+        return argsort(self._grid, kind='stable').astype(dtype)
+
+    def _letter_positions(self, letter: int) -> 'ndarray':
+        """ The flat positions of every cell holding letter. """
+        return self._positions[self._offsets[letter]:self._offsets[letter + 1]]
+
+    def _search(self, key: bytes, direction: 'Direction') -> 'Starts':
+        """ Find the flat start positions of key in a direction.
+
+        Candidates are the positions of the rarest letter of key, which
+        are then checked against the other letters, rarest first, all at
+        once.
+        """
+        length = self._axis_length  # type: int
+        row_step, column_step = direction
+        step = row_step * length + column_step  # type: int
+        span = len(key) - 1  # type: int
+
+        letters = sorted(
+            range(len(key)),
+            key=lambda index: self._counts[key[index]],
+        )  # type: List[int]
+        anchor = letters[0]  # type: int
+
+        positions = self._letter_positions(key[anchor]).astype(int64)  # type: ndarray
+        rows = positions // length - anchor * row_step  # type: ndarray
+        columns = positions % length - anchor * column_step  # type: ndarray
+        inside = (
+            (rows >= 0) & (rows < length)
+            & (rows + span * row_step >= 0) & (rows + span * row_step < length)
+            & (columns >= 0) & (columns < length)
+            & (columns + span * column_step >= 0)
+            & (columns + span * column_step < length)
+        )  # type: ndarray
+        starts = positions[inside] - anchor * step  # type: Starts
+
+        for index in letters[1:]:
+            if starts.size == 0:
+                break
+            starts = starts[self._grid[starts + index * step] == key[index]]
+
+        return starts
+
+    def _encode(self, word: str) -> 'Optional[bytes]':
+        """ The word as bytes, or None if it can't be anywhere in the grid. """
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return None
+        if len(key) > self._axis_length:
+            return None
+        if not all(self._counts[letter] for letter in key):
+            return None
+
+        return key
+
+    def locate(self, word: str) -> 'List[Location]':
+        """ Find the row, column and direction of every occurrence of the word.
+
+        The empty word has no location.
+        """
+        key = self._encode(word)  # type: Optional[bytes]
+        if not key:
+            return []
+
+        locations = []  # type: List[Location]
+        for name, direction in zip(self._names, self._directions):
+            rows, columns = divmod(self._search(key, direction), self._axis_length)
+            locations.extend(
+                (row, column, name)
+                for row, column in zip(rows.tolist(), columns.tolist())
+            )
+
+        return sorted(locations)
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained within the grid. """
+        key = self._encode(word)  # type: Optional[bytes]
+        if key is None:
+            return False
+        if not key:
+            return True
+
+        return any(
+            self._search(key, direction).size
+            for direction in self._directions
+        )
@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+from collections import deque
+
+
+if TYPE_CHECKING:
+    from typing import Deque, Dict, Iterable, List, Optional, Set
+
+
+class Automaton:
+
+    def __init__(self, words: 'Iterable[str]') -> None:
+        self._goto = [{}]  # type: List[Dict[str, int]]
+        self._fail = [0]  # type: List[int]
+        self._output = [0]  # type: List[int]
+        self._words = [None]  # type: List[Optional[str]]
+
+        for word in words:
+            self._add_word(word)
+
+        self._size = sum(
+            word is not None
+            for word in self._words
+        )  # type: int
+        self._link()
+
+    def _add_word(self, word: str) -> None:
+        """ Add the states needed to spell out word. """
+        state = 0  # type: int
+        for character in word:
+            try:
+                state = self._goto[state][character]
+            except KeyError:
+                self._goto[state][character] = len(self._goto)
+                state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+                self._words.append(None)
+
+        self._words[state] = word
+
+    def _link(self) -> None:
+        """ Breadth first computation of failure and output links. """
+        queue = deque(self._goto[0].values())  # type: Deque[int]
+        while queue:
+            state = queue.popleft()  # type: int
+            for character, child in self._goto[state].items():
+                queue.append(child)
+
+                fallback = self._fail[state]  # type: int
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fallback = self._goto[fallback].get(character, 0)
+
+                self._fail[child] = fallback
+                if self._words[fallback] is not None:
+                    self._output[child] = fallback
+                else:
+                    self._output[child] = self._output[fallback]
+
+    def search(self, texts: 'Iterable[str]') -> 'Set[str]':
+        """ Stream texts through the automaton and return the words found. """
+        goto, fail = self._goto, self._fail
+        output, words = self._output, self._words
+
+        found = set()  # type: Set[str]
+        if words[0] is not None:
+            found.add(words[0])
+
+        for text in texts:
+            state = 0  # type: int
+            for character in text:
+                while state and character not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(character, 0)
+
+                match = state if words[state] is not None else output[state]
+                while match:
+                    found.add(words[match])
+                    match = output[match]
+
+            if len(found) == self._size:
+                break
+
+        return found
+
+    def __len__(self) -> int:
+        """ The number of distinct words in the automaton. """
+        return self._size
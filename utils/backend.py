@@ -0,0 +1,72 @@
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+    from types import TracebackType
+
+    # The row, column and direction of the first letter of a word.
+    Location = Tuple[int, int, str]
+    # The row, column and new letter of a cell.
+    Cell = Tuple[int, int, str]
+
+
+def check_cell(row: int, column: int, letter: str, axis_length: int) -> None:
+    """ Make sure a cell is within the grid and holds a single lowercase letter. """
+    if not (0 <= row < axis_length and 0 <= column < axis_length):
+        raise RuntimeError('Cell {},{} is outside the grid!'.format(row, column))
+    if len(letter) != 1 or not 'a' <= letter <= 'z':
+        raise ValueError('Cells hold a single lowercase letter, not {!r}!'.format(letter))
+
+
+class Backend:
+    locates = False  # type: bool
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Find which words are contained within the backend. """
+        return {
+            word
+            for word in words
+            if word in self
+        }
+
+    def locate(self, word: str) -> 'List[Location]':
+        """ Find the row, column and direction of every occurrence of the word. """
+        raise NotImplementedError
+
+    def count(self, word: str) -> int:
+        """ Count the occurrences of the word. """
+        return len(self.locate(word))
+
+    def locate_all(self, words: 'Iterable[str]') -> 'Dict[str, List[Location]]':
+        """ Find every occurrence of each of the words. """
+        return {
+            word: self.locate(word)
+            for word in words
+        }
+
+    def set_cell(self, row: int, column: int, letter: str) -> None:
+        """ Change the letter of one cell of the grid. """
+        self.apply_patch(((row, column, letter),))
+
+    def apply_patch(self, cells: 'Iterable[Cell]') -> None:
+        """ Change the letters of cells of the grid, updating only what holds them. """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """ Release any resources held by the backend. """
+
+    def __enter__(self) -> 'Backend':
+        return self
+
+    def __exit__(
+                self,
+                exc_type: 'Optional[Type[BaseException]]',
+                exc_value: 'Optional[BaseException]',
+                traceback: 'Optional[TracebackType]',
+            ) -> None:
+        self.close()
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained within the backend. """
+        raise NotImplementedError
@@ -0,0 +1,400 @@
+from typing import TYPE_CHECKING
+from argparse import ArgumentParser
+from json import dump, load
+from multiprocessing import get_all_start_methods, get_context
+from os import cpu_count
+from pathlib import Path
+from random import Random
+from string import ascii_lowercase
+from sys import exit, stderr
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from numpy import frombuffer, uint8
+
+from utils.files import read_grid
+from utils.generation import create_grid, find_present
+from utils.instrumentation import peak_memory
+from utils.registry import (
+    BACKENDS,
+    MAX_WORD_LIMITS,
+    MEMORY_COSTS,
+    create_backend,
+    load_backend,
+    physical_memory,
+)
+
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+    from argparse import Namespace as ParsedArguments
+    from multiprocessing.connection import Connection
+
+    from numpy import ndarray
+
+    Record = Dict[str, Any]
+    Key = Tuple[Any, ...]
+
+
+SIZES = (100, 1000, 5000, 20000)  # type: Tuple[int, ...]
+BENCHMARK_BACKENDS = (
+    'grid',
+    'trie',
+    'kgram',
+    'suffix_array',
+    'bitset',
+    'anchored',
+    'tiled',
+)  # type: Tuple[str, ...]
+MULTIPROCESS_BACKENDS = ('grid', 'trie')  # type: Tuple[str, ...]
+WORD_COUNT = 1000  # type: int
+HIT_RATIO = 0.5  # type: float
+WORD_LENGTHS = (3, 8)  # type: Tuple[int, int]
+MISS_ATTEMPTS = 20  # type: int
+WINDOW_SIZE = 100  # type: int
+REGRESSION_THRESHOLD = 1.25  # type: float
+TIMINGS = ('build_seconds', 'query_seconds', 'batch_seconds')  # type: Tuple[str, ...]
+
+
+def create_words(
+            grid: str,
+            length: int,
+            amount: int,
+            hit_ratio: float,
+            word_lengths: 'Tuple[int, int]',
+            random: Random,
+        ) -> 'List[str]':
+    """ Create words of which about hit_ratio are taken from the rows and columns.
+
+    The rest are random letters, drawn again while they're in the grid,
+    a letter longer each time up to the longest length since large grids
+    hold every short word. Words still found after MISS_ATTEMPTS draws are
+    kept, so fewer than intended may be missing.
+    """
+    shortest, longest = min(word_lengths[0], length), min(word_lengths[1], length)
+    words = []  # type: List[str]
+    misses = []  # type: List[int]
+    for _ in range(amount):
+        size = random.randint(shortest, longest)  # type: int
+        if random.random() >= hit_ratio:
+            misses.append(len(words))
+            words.append(_random_word(size, random))
+            continue
+
+        line, start = random.randrange(length), random.randrange(length - size + 1)
+        if random.random() < 0.5:
+            words.append(grid[line*length + start:line*length + start + size])
+        else:
+            words.append(grid[start*length + line:(start + size)*length + line:length])
+
+    letters = frombuffer(grid.encode('ascii'), dtype=uint8).reshape(length, length)  # type: ndarray
+    for _ in range(MISS_ATTEMPTS):
+        present = find_present(letters, (words[index] for index in misses))  # type: Set[str]
+        misses = [
+            index
+            for index in misses
+            if words[index] in present
+        ]
+        if not misses:
+            break
+        for index in misses:
+            words[index] = _random_word(min(len(words[index]) + 1, longest), random)
+
+    return words
+
+
+def _random_word(size: int, random: Random) -> str:
+    return ''.join(random.choice(ascii_lowercase) for _ in range(size))
+
+
+def hit_ratio_of(grid: str, length: int, words: 'List[str]') -> float:
+    """ The fraction of the words which are in the rows or columns of the grid. """
+    letters = frombuffer(grid.encode('ascii'), dtype=uint8).reshape(length, length)  # type: ndarray
+    present = find_present(letters, words)  # type: Set[str]
+
+    return sum(word in present for word in words) / len(words) if words else 0.0
+
+
+def measure(function: 'Callable[[], Any]') -> 'Tuple[Any, float]':
+    """ Call function, returning its result and the seconds it took. """
+    started = perf_counter()  # type: float
+    result = function()  # type: Any
+
+    return result, perf_counter() - started
+
+
+def run_backend(
+            name: str,
+            multiprocessing: bool,
+            path: Path,
+            length: int,
+            words: 'List[str]',
+            max_word: int,
+        ) -> 'Record':
+    """ Time building a backend and checking the words one at a time and all at once.
+
+    The peak memory is the growth in the resident memory of the process
+    after the grid is read, so this should run in a fresh process.
+    """
+    load_backend(name)
+    grid = read_grid(path)  # type: str
+    resident = peak_memory()  # type: int
+
+    backend, build_seconds = measure(lambda: create_backend(
+        name,
+        path if name == 'tiled' else grid,
+        axis_length=length,
+        window_size=min(WINDOW_SIZE, length),
+        max_word=max_word,
+        multiprocessing=multiprocessing,
+        index_dir=None,
+    ))
+    try:
+        results, query_seconds = measure(lambda: [word in backend for word in words])
+        found, batch_seconds = measure(lambda: backend.find_all(words))
+    finally:
+        backend.close()
+
+    return {
+        'build_seconds': build_seconds,
+        'query_seconds': query_seconds,
+        'batch_seconds': batch_seconds,
+        'peak_bytes': peak_memory() - resident,
+        'words_per_second': len(words) / query_seconds if query_seconds else None,
+        'found': sum(results),
+        'consistent': set(found) == {word for word, result in zip(words, results) if result},
+    }
+
+
+def _run_isolated(connection: 'Connection', *arguments: 'Any') -> None:
+    connection.send(run_backend(*arguments))
+    connection.close()
+
+
+def run_isolated(*arguments: 'Any') -> 'Record':
+    """ Run a backend's benchmark in a new process, so earlier runs don't affect it.
+
+    Forking is preferred since the pools started by the backends then fork
+    too, rather than inheriting spawn from this process.
+    """
+    context = get_context('fork' if 'fork' in get_all_start_methods() else 'spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_isolated, args=(sender,) + arguments)
+    process.start()
+    sender.close()
+
+    try:
+        return receiver.recv()
+    except EOFError:
+        raise RuntimeError('Benchmark of {} failed'.format(arguments[0]))
+    finally:
+        process.join()
+
+
+def skip_reason(name: str, size: int, max_word: int, memory: 'Optional[int]') -> 'Optional[str]':
+    """ Why a backend can't be benchmarked for a grid size, if it can't. """
+    if max_word > MAX_WORD_LIMITS.get(name, max_word):
+        return 'words longer than {}'.format(MAX_WORD_LIMITS[name])
+    if name in MEMORY_COSTS and memory is not None and MEMORY_COSTS[name](size**2, max_word) > memory:
+        return 'not enough memory'
+
+    return None
+
+
+def run_benchmarks(
+            sizes: 'Sequence[int]',
+            backends: 'Sequence[str]' = BENCHMARK_BACKENDS,
+            word_count: int = WORD_COUNT,
+            hit_ratio: float = HIT_RATIO,
+            word_lengths: 'Tuple[int, int]' = WORD_LENGTHS,
+            random_seed: int = 0,
+            multiprocess: bool = True,
+        ) -> 'List[Record]':
+    """ Benchmark every backend, serially and with multiprocessing, on a grid of each size. """
+    memory = physical_memory()  # type: Optional[int]
+    records = []  # type: List[Record]
+
+    for size in sizes:
+        grid = create_grid(size, random_seed)  # type: str
+        words = create_words(
+            grid,
+            size,
+            word_count,
+            hit_ratio,
+            word_lengths,
+            Random(random_seed),
+        )  # type: List[str]
+        max_word = max(map(len, words), default=1)  # type: int
+        achieved = hit_ratio_of(grid, size, words)  # type: float
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'grid.txt'  # type: Path
+            with path.open('w') as file:
+                for row in range(size):
+                    file.write(grid[row*size:(row + 1)*size] + '\n')
+
+            for name in backends:
+                modes = (False, True) if multiprocess and name in MULTIPROCESS_BACKENDS else (False,)
+                for multiprocessing in modes:
+                    record = {
+                        'backend': name,
+                        'multiprocessing': multiprocessing,
+                        'size': size,
+                        'words': word_count,
+                        'hit_ratio': hit_ratio,
+                        'achieved_hit_ratio': achieved,
+                        'word_lengths': list(word_lengths),
+                        'cores': cpu_count(),
+                    }  # type: Record
+
+                    reason = skip_reason(name, size, max_word, memory)  # type: Optional[str]
+                    if reason is not None:
+                        record['skipped'] = reason
+                    else:
+                        record.update(run_isolated(
+                            name,
+                            multiprocessing,
+                            path,
+                            size,
+                            words,
+                            max_word,
+                        ))
+                    records.append(record)
+                    print(record, file=stderr)
+
+    return records
+
+
+def _key(record: 'Record') -> 'Key':
+    return (
+        record['backend'],
+        record['multiprocessing'],
+        record['size'],
+        record['words'],
+        record['hit_ratio'],
+        tuple(record['word_lengths']),
+    )
+
+
+def compare(
+            records: 'List[Record]',
+            baseline: 'List[Record]',
+            threshold: float = REGRESSION_THRESHOLD,
+        ) -> 'List[str]':
+    """ Describe every timing more than threshold times slower than in the baseline. """
+    previous = {
+        _key(record): record
+        for record in baseline
+    }  # type: Dict[Key, Record]
+
+    regressions = []  # type: List[str]
+    for record in records:
+        old = previous.get(_key(record))  # type: Optional[Record]
+        if old is None:
+            continue
+
+        for timing in TIMINGS:
+            if record.get(timing) is None or not old.get(timing):
+                continue
+            ratio = record[timing] / old[timing]  # type: float
+            if ratio > threshold:
+                regressions.append('{} ({}multiprocess, {}x{}): {} {:.2f}x slower'.format(
+                    record['backend'],
+                    '' if record['multiprocessing'] else 'no ',
+                    record['size'],
+                    record['size'],
+                    timing,
+                    ratio,
+                ))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Benchmark every data structure on generated grids and words',
+    )  # type: ArgumentParser
+
+    parser.add_argument(
+        'output',
+        type=Path,
+        help='Location at which to store the results as json',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=SIZES,
+        help='The side lengths of the grids to generate.',
+    )
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        choices=sorted(BACKENDS),
+        default=BENCHMARK_BACKENDS,
+        help='The data structures to benchmark.',
+    )
+    parser.add_argument(
+        '--words',
+        type=int,
+        default=WORD_COUNT,
+        help='The amount of words to check in each grid.',
+    )
+    parser.add_argument(
+        '--hit-ratio',
+        type=float,
+        default=HIT_RATIO,
+        help='The fraction of words taken from the grid.',
+    )
+    parser.add_argument(
+        '--word-lengths',
+        type=int,
+        nargs=2,
+        default=WORD_LENGTHS,
+        metavar=('SHORTEST', 'LONGEST'),
+        help='The range of word lengths.',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='The seed for the generated grids and words.',
+    )
+    parser.add_argument(
+        '--no-multiprocess',
+        help='Only benchmark without multiprocessing.',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        help='Results of an earlier run to compare against.',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help='How many times slower than the baseline counts as a regression.',
+    )
+
+    arguments = parser.parse_args()  # type: ParsedArguments
+
+    records = run_benchmarks(
+        arguments.sizes,
+        arguments.backends,
+        arguments.words,
+        arguments.hit_ratio,
+        tuple(arguments.word_lengths),
+        arguments.seed,
+        not arguments.no_multiprocess,
+    )  # type: List[Record]
+    with arguments.output.open('w') as file:
+        dump(records, file, indent=2)
+
+    if arguments.baseline is not None:
+        with arguments.baseline.open('r') as file:
+            regressions = compare(records, load(file), arguments.threshold)  # type: List[str]
+        for regression in regressions:
+            print('Regression:', regression)
+        if regressions:
+            exit(1)
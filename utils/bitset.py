@@ -0,0 +1,93 @@
+from typing import TYPE_CHECKING
+from string import ascii_lowercase
+
+from numpy import packbits
+
+from utils.backend import Backend
+from utils.instrumentation import progress
+from utils.text import separated_lines
+
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List, Set
+
+    from numpy import ndarray
+
+    from utils.files import GridData
+
+    Masks = Dict[str, int]
+
+
+class BitGrid(Backend):
+
+    def __init__(self, grid: 'GridData', axis_length: int) -> None:
+        self._axis_length = axis_length  # type: int
+
+        progress('Building bitsets: ...', end='\r')
+        if len(grid) != self._axis_length**2:
+            raise RuntimeError('grid is not the right size!')
+
+        self._masks = self._generate_masks(grid)  # type: Masks
+        progress('Building bitsets: DONE')
+
+    def _generate_masks(self, grid: 'GridData') -> 'Masks':
+        """ Create a bitset per letter over every row and then every column.
+
+        Bit i of a letter's bitset is set when the ith letter of the rows
+        and columns, each followed by a separator, is that letter. No
+        letter has a separator's bit set, so words can't span two axes.
+        """
+        text = separated_lines(grid, self._axis_length)  # type: ndarray
+
+        return {
+            letter: int.from_bytes(
+                packbits(text == ord(letter), bitorder='little').tobytes(),
+                'little',
+            )
+            for letter in ascii_lowercase
+        }
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Find which words are contained within the grid.
+
+        Words are searched in sorted order so the bitsets for a prefix
+        shared with the previous word are reused rather than recomputed.
+        """
+        masks = self._masks  # type: Masks
+        found = set()  # type: Set[str]
+        states = []  # type: List[int]
+        previous = ''  # type: str
+
+        for word in sorted(set(words)):
+            common = 0  # type: int
+            for first, second in zip(previous, word):
+                if first != second or common == len(states):
+                    break
+                common += 1
+            del states[common:]
+
+            for letter in word[common:]:
+                if states and not states[-1]:
+                    break
+                mask = masks.get(letter, 0)  # type: int
+                states.append((states[-1] << 1) & mask if states else mask)
+
+            if len(states) == len(word) and (not states or states[-1]):
+                found.add(word)
+            previous = word
+
+        return found
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained within the grid using Shift-And. """
+        if not word:
+            return True
+
+        masks = self._masks  # type: Masks
+        state = masks.get(word[0], 0)  # type: int
+        for letter in word[1:]:
+            if not state:
+                return False
+            state = (state << 1) & masks.get(letter, 0)
+
+        return bool(state)
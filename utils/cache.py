@@ -0,0 +1,68 @@
+from typing import TYPE_CHECKING
+from collections import OrderedDict
+
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Optional
+
+
+CACHE_SIZE = 2**16  # type: int
+
+
+class LRUCache:
+
+    def __init__(self, max_size: 'Optional[int]' = CACHE_SIZE) -> None:
+        if max_size is not None and max_size < 0:
+            raise RuntimeError('Cache size can\'t be negative!')
+
+        self._max_size = max_size  # type: Optional[int]
+        self._results = OrderedDict()  # type: OrderedDict[str, bool]
+
+        self.hits = 0  # type: int
+        self.misses = 0  # type: int
+        self.evictions = 0  # type: int
+
+    def lookup(self, word: str, search: 'Callable[[str], bool]') -> bool:
+        """ Get the result for word, searching for it on a miss.
+
+        A max_size of 0 disables the cache and None leaves it unbounded,
+        otherwise the least recently used result is evicted once full.
+        """
+        if word in self._results:
+            self.hits += 1
+            self._results.move_to_end(word)
+            return self._results[word]
+
+        self.misses += 1
+        result = search(word)  # type: bool
+        if self._max_size == 0:
+            return result
+
+        self._results[word] = result
+        if self._max_size is not None and len(self._results) > self._max_size:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+        return result
+
+    def clear(self) -> None:
+        """ Remove every result, keeping the counters. """
+        self._results.clear()
+
+    def stats(self) -> 'Dict[str, int]':
+        """ The counters along with the current and maximum size. """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._results),
+            'max_size': -1 if self._max_size is None else self._max_size,
+        }
+
+    def __len__(self) -> int:
+        """ The number of results held. """
+        return len(self._results)
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the result for word is held, without counting a hit. """
+        return word in self._results
@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+from argparse import ArgumentParser
+from json import dumps, loads
+from socket import AF_UNIX, SOCK_STREAM, socket
+from sys import stderr
+from time import perf_counter
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, List, Optional, Type
+    from argparse import Namespace as ParsedArguments
+    from types import TracebackType
+
+    Response = Dict[str, Any]
+
+
+class QueryClient:
+
+    def __init__(self, address: str, grid: 'Optional[str]' = None) -> None:
+        self._grid = grid  # type: Optional[str]
+        self._socket = socket(AF_UNIX, SOCK_STREAM)  # type: socket
+        self._socket.connect(address)
+        self._file = self._socket.makefile('rwb')
+
+    def find(self, words: 'Iterable[str]') -> 'List[bool]':
+        """ Ask the server whether each of the words is in the grid. """
+        request = {'words': list(words)}  # type: Dict[str, Any]
+        if self._grid is not None:
+            request['grid'] = self._grid
+
+        self._file.write(dumps(request).encode('utf-8') + b'\n')
+        self._file.flush()
+        response = loads(self._file.readline().decode('utf-8'))  # type: Response
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+
+        return response['found']
+
+    def is_present(self, word: str) -> bool:
+        """ Ask the server whether the word is in the grid. """
+        return self.find((word,))[0]
+
+    def close(self) -> None:
+        """ Close the connection to the server. """
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> 'QueryClient':
+        return self
+
+    def __exit__(
+                self,
+                exc_type: 'Optional[Type[BaseException]]',
+                exc_value: 'Optional[BaseException]',
+                traceback: 'Optional[TracebackType]',
+            ) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Check presence of words using a running wordsearch server',
+    )  # type: ArgumentParser
+
+    parser.add_argument(
+        'socket',
+        help='The socket the server is listening on',
+    )
+    parser.add_argument(
+        'words',
+        nargs='+',
+        help='The words to check',
+    )
+    parser.add_argument(
+        '--grid',
+        help='The name of the grid to search when serving more than one.',
+    )
+
+    arguments = parser.parse_args()  # type: ParsedArguments
+
+    with QueryClient(arguments.socket, arguments.grid) as client:
+        start = perf_counter()  # type: float
+        results = client.find(arguments.words)  # type: List[bool]
+        elapsed = perf_counter() - start  # type: float
+
+    for word, found in zip(arguments.words, results):
+        if found:
+            print("found {}".format(word))
+    print('Query took {:.3f}ms'.format(elapsed * 1000), file=stderr)
@@ -0,0 +1,137 @@
+from typing import TYPE_CHECKING
+
+from numpy import frombuffer, nonzero, uint8
+
+from utils.backend import Backend
+
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, List, Tuple
+
+    from numpy import ndarray
+
+    from utils.backend import Location
+    from utils.files import GridData
+
+    Direction = Tuple[int, int]
+    Positions = Tuple[ndarray, ndarray]
+
+
+DIRECTIONS = {
+    'right': (0, 1),
+    'left': (0, -1),
+    'down': (1, 0),
+    'up': (-1, 0),
+    'down_right': (1, 1),
+    'up_left': (-1, -1),
+    'down_left': (1, -1),
+    'up_right': (-1, 1),
+}  # type: Dict[str, Direction]
+
+
+class DirectionalGrid(Backend):
+    locates = True  # type: bool
+
+    def __init__(
+                self,
+                grid: 'GridData',
+                axis_length: int,
+                directions: 'Iterable[str]' = tuple(DIRECTIONS),
+            ) -> None:
+        self._axis_length = axis_length  # type: int
+        self._names = tuple(directions)  # type: Tuple[str, ...]
+        self._directions = tuple(
+            DIRECTIONS[direction]
+            for direction in self._names
+        )  # type: Tuple[Direction, ...]
+
+        if len(grid) != self._axis_length**2:
+            raise RuntimeError('grid is not the right size!')
+        if isinstance(grid, str):
+            grid = grid.encode('ascii')
+
+        self._grid = frombuffer(
+            grid,
+            dtype=uint8,
+        ).reshape(axis_length, axis_length)  # type: ndarray
+
+    def _bounds(self, step: int, length: int) -> 'Tuple[int, int]':
+        """ The range of starting indexes on an axis that keep length letters in the grid. """
+        if step > 0:
+            return 0, self._axis_length - (length - 1)*step
+        else:
+            return -(length - 1)*step, self._axis_length
+
+    def _views(self, direction: 'Direction', length: int) -> 'List[ndarray]':
+        """ Views of the grid lining up the letters of every word in a direction.
+
+        The kth view holds the kth letter of the words starting at each
+        position, so the views are plain slices of the grid and nothing is
+        copied.
+        """
+        row_step, column_step = direction
+        row_start, row_stop = self._bounds(row_step, length)
+        column_start, column_stop = self._bounds(column_step, length)
+
+        return [
+            self._grid[
+                row_start + index*row_step:row_stop + index*row_step,
+                column_start + index*column_step:column_stop + index*column_step,
+            ]
+            for index in range(length)
+        ]
+
+    def _search(self, key: bytes, direction: 'Direction') -> 'Positions':
+        """ Find the positions, relative to the views, of key in a direction. """
+        views = self._views(direction, len(key))  # type: List[ndarray]
+
+        rows, columns = nonzero(views[0] == key[0])
+        for view, letter in zip(views[1:], key[1:]):
+            keep = view[rows, columns] == letter  # type: ndarray
+            rows, columns = rows[keep], columns[keep]
+            if rows.size == 0:
+                break
+
+        return rows, columns
+
+    def locate(self, word: str) -> 'List[Location]':
+        """ Find the row, column and direction of every occurrence of the word.
+
+        The empty word has no location.
+        """
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return []
+        if not key or len(key) > self._axis_length:
+            return []
+
+        locations = []  # type: List[Location]
+        for name, direction in zip(self._names, self._directions):
+            rows, columns = self._search(key, direction)
+            row_start, _ = self._bounds(direction[0], len(key))
+            column_start, _ = self._bounds(direction[1], len(key))
+            locations.extend(
+                (row_start + row, column_start + column, name)
+                for row, column in zip(rows.tolist(), columns.tolist())
+            )
+
+        return sorted(locations)
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained in any direction within the grid. """
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return False
+        if not key:
+            return True
+        if len(key) > self._axis_length:
+            return False
+
+        for direction in self._directions:
+            rows, _ = self._search(key, direction)
+            if rows.size:
+                return True
+
+        return False
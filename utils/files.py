@@ -1,28 +1,93 @@
 from typing import TYPE_CHECKING
+from itertools import islice
+from json import dumps
+from mmap import mmap, ACCESS_READ
+from os import fstat
 from string import ascii_lowercase
 
+from utils.instrumentation import phase
+
 
 if TYPE_CHECKING:
-    from typing import List
+    from typing import Iterable, Iterator, List, TextIO, Tuple, Union
     from pathlib import Path
 
+    GridData = Union[str, bytes]
+    Result = Tuple[str, bool]
+
+
+WORD_CHUNK_SIZE = 10000  # type: int
+COUNT_BLOCK_SIZE = 2**20  # type: int
+GRID_BLOCK_SIZE = 2**24  # type: int
+
+
+_NON_LETTERS = bytes(
+    character
+    for character in range(256)
+    if character not in ascii_lowercase.encode('ascii')
+)  # type: bytes
+
+
+def read_grid_bytes(path: 'Path') -> bytearray:
+    """ Read grid from file as bytes.
+
+    The file is memory mapped and every non letter is deleted by
+    bytes.translate a block at a time, into a buffer the size of the file,
+    so only one block is ever copied out of the file at once.
+    """
+    with phase('read_grid') as counts, path.open('rb') as file:
+        counts['bytes'] = fstat(file.fileno()).st_size
+        if counts['bytes'] == 0:
+            return bytearray()
+
+        grid = bytearray(counts['bytes'])  # type: bytearray
+        length = 0  # type: int
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+            for start in range(0, counts['bytes'], GRID_BLOCK_SIZE):
+                letters = mapped[start:start + GRID_BLOCK_SIZE].translate(None, _NON_LETTERS)  # type: bytes
+                grid[length:length + len(letters)] = letters
+                length += len(letters)
+        del grid[length:]
+
+        return grid
+
 
 def read_grid(path: 'Path') -> str:
     """ Read grid from file. """
-    grid = ''  # type: str
-    with path.open('r') as file:
-        for line in file:
-            grid += ''.join(filter(lambda x: x in ascii_lowercase, line))
-
-    return grid
+    return read_grid_bytes(path).decode('ascii')
 
 
 def read_words(path: 'Path') -> 'List[str]':
     """ Read words from file. """
-    words = []  # type: List[str]
+    with path.open('r') as file:
+        return list(map(str.strip, file.read().splitlines()))
+
 
+def count_words(path: 'Path') -> int:
+    """ Count the words in a file by its lines, without holding it in memory. """
+    count = 0  # type: int
+    last = b'\n'  # type: bytes
+    with path.open('rb') as file:
+        for block in iter(lambda: file.read(COUNT_BLOCK_SIZE), b''):
+            count += block.count(b'\n')
+            last = block[-1:]
+
+    return count + (last != b'\n')
+
+
+def iter_words(path: 'Path', chunk_size: int = WORD_CHUNK_SIZE) -> 'Iterator[List[str]]':
+    """ Lazily read words from file in chunks of at most chunk_size words. """
     with path.open('r') as file:
-        for line in file:
-            words.append(line.strip())
+        while True:
+            chunk = list(map(str.strip, islice(file, chunk_size)))  # type: List[str]
+            if not chunk:
+                return
+            yield chunk
+
 
-    return words
+def write_results(file: 'TextIO', results: 'Iterable[Result]') -> None:
+    """ Write each word and whether it was found as a line of JSON. """
+    file.writelines(
+        dumps({'word': word, 'found': found}) + '\n'
+        for word, found in results
+    )
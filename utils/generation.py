@@ -1,66 +1,236 @@
 from typing import TYPE_CHECKING
 from argparse import ArgumentParser
 from json import dump, load
-from math import sqrt
 from pathlib import Path
-from random import choice, randrange, sample, shuffle
-from string import ascii_lowercase
+from random import sample, shuffle
+
+from numpy import (
+    ascontiguousarray,
+    concatenate,
+    flatnonzero,
+    full,
+    uint32,
+    uint8,
+    unique,
+    where,
+    zeros,
+)
+from numpy.random import default_rng
 
 from wordsearch import MAX_WORD_LENGTH
-from utils.files import read_grid
-from utils.grid import Grid
+from utils.tiles import map_grid
 
 
 if TYPE_CHECKING:
-    from typing import Dict, List
+    from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
     from argparse import (
         _SubParsersAction as SubParsers,
         Namespace as ParsedArguments,
     )
 
+    from numpy import ndarray
+    from numpy.random import Generator
+
+    # The words with the same first letters, by the code of those letters.
+    Targets = Dict[int, List[str]]
+
+
+FIRST_LETTER = ord('a')  # type: int
+LETTERS = 26  # type: int
+NEWLINE = ord('\n')  # type: int
+GRID_BLOCK_SIZE = 2**24  # type: int
+INDEX_BLOCK_SIZE = 2**22  # type: int
+# Letters are base 27 digits from 1, so any 6 letters have a unique code
+# which fits in 32 bits.
+CODE_BASE = 27  # type: int
+PREFIX_LENGTH = 6  # type: int
+FILTER_MASK = 2**20 - 1  # type: int
+
 
-def create_grid(length: int) -> str:
+def create_rows(length: int, seed: 'Optional[int]' = None) -> 'Iterator[ndarray]':
+    """ Create the rows of a random grid as blocks of letters. """
+    generator = default_rng(seed)  # type: Generator
+    block = max(1, GRID_BLOCK_SIZE // length)  # type: int
+
+    for row in range(0, length, block):
+        yield generator.integers(
+            FIRST_LETTER,
+            FIRST_LETTER + LETTERS,
+            size=(min(block, length - row), length),
+            dtype=uint8,
+        )
+
+
+def create_grid(length: int, seed: 'Optional[int]' = None) -> str:
     """ Create a random grid. """
-    return ''.join(choice(ascii_lowercase) for _ in range(length**2))
+    return b''.join(
+        rows.tobytes()
+        for rows in create_rows(length, seed)
+    ).decode('ascii')
 
 
-def write_grid(path: Path, length: int) -> None:
-    """ Write a random grid to a file. """
-    grid = create_grid(length)  # type: str
+def write_grid(path: Path, length: int, seed: 'Optional[int]' = None) -> None:
+    """ Write a random grid to a file, a block of rows at a time. """
+    with path.open('wb') as file:
+        for rows in create_rows(length, seed):
+            file.write(concatenate(
+                (rows, full((len(rows), 1), NEWLINE, dtype=uint8)),
+                axis=1,
+            ).tobytes())
 
-    with path.open('w') as file:
-        for i in range(length):
-            file.write(grid[i*length:(i+1)*length] + '\n')
 
+def _digits(letters: 'ndarray') -> 'ndarray':
+    """ Turn letters into base 27 digits, with anything but a lowercase letter as 0. """
+    return where(
+        (letters >= FIRST_LETTER) & (letters < FIRST_LETTER + LETTERS),
+        letters.astype(uint32) - (FIRST_LETTER - 1),
+        0,
+    ).astype(uint32)
+
+
+def _word_digits(word: str) -> 'List[int]':
+    return [ord(letter) - FIRST_LETTER + 1 for letter in word]
+
+
+def _code(word: str) -> int:
+    code = 0  # type: int
+    for digit in _word_digits(word[:PREFIX_LENGTH]):
+        code = code * CODE_BASE + digit
+
+    return code
+
+
+def _search_lines(
+            lines: 'ndarray',
+            starts: int,
+            overlap: int,
+            targets: 'Dict[int, Targets]',
+            found: 'Set[str]',
+        ) -> None:
+    """ Find the targets starting within the first starts digits of each line.
+
+    The codes of the first letters of every position are found at once,
+    and only positions matching a target's code are checked one at a time.
+    Found words are moved from targets into found.
+    """
+    padded = zeros((len(lines), starts + overlap), dtype=uint32)  # type: ndarray
+    padded[:, :lines.shape[1]] = lines[:, :padded.shape[1]]
+
+    codes = zeros((len(lines), starts), dtype=uint32)  # type: ndarray
+    for length in range(1, max(targets) + 1):
+        codes *= uint32(CODE_BASE)
+        codes += padded[:, length - 1:length - 1 + starts]
+        if length not in targets:
+            continue
+
+        words = targets[length]  # type: Targets
+        table = zeros(FILTER_MASK + 1, dtype=bool)  # type: ndarray
+        table[[code & FILTER_MASK for code in words]] = True
+
+        flat = codes.reshape(-1)  # type: ndarray
+        for code in unique(flat[table[flat & uint32(FILTER_MASK)]]).tolist():
+            if code not in words:
+                continue
+
+            positions = [
+                divmod(position, starts)
+                for position in flatnonzero(flat == uint32(code)).tolist()
+            ]  # type: List[Tuple[int, int]]
+            for word in list(words[code]):
+                digits = _word_digits(word)  # type: List[int]
+                if len(word) == length or any(
+                    padded[line, start:start + len(word)].tolist() == digits
+                    for line, start in positions
+                ):
+                    found.add(word)
+                    words[code].remove(word)
+            if not words[code]:
+                del words[code]
 
-def generate_words(grid_string: str, amount: int) -> 'Dict[str, bool]':
+        if not words:
+            del targets[length]
+            if not targets:
+                return
+
+
+def find_present(grid: 'ndarray', words: 'Iterable[str]') -> 'Set[str]':
+    """ Find which of the words are in the rows or columns of a grid of letters.
+
+    The grid is read a block of rows at a time, so it can be memory mapped.
+    """
+    targets = {}  # type: Dict[int, Targets]
+    for word in set(words):
+        if word and all('a' <= letter <= 'z' for letter in word):
+            targets.setdefault(
+                min(len(word), PREFIX_LENGTH),
+                {},
+            ).setdefault(_code(word), []).append(word)
+
+    overlap = max(
+        (len(word) for codes in targets.values() for matches in codes.values() for word in matches),
+        default=1,
+    ) - 1  # type: int
+    found = set()  # type: Set[str]
+    height, width = grid.shape
+    block = max(1, INDEX_BLOCK_SIZE // width)  # type: int
+
+    for row in range(0, height, block):
+        if not targets:
+            break
+        rows = min(block, height - row)  # type: int
+        digits = _digits(grid[row:row + block + overlap])  # type: ndarray
+
+        _search_lines(digits[:rows], width, overlap, targets, found)
+        if targets:
+            _search_lines(ascontiguousarray(digits.T), rows, overlap, targets, found)
+
+    return found
+
+
+def generate_words(
+            grid: 'ndarray',
+            amount: int,
+            seed: 'Optional[int]' = None,
+        ) -> 'Dict[str, bool]':
     """ Get random words from the grid.
 
-    Also trys to construct words that won't be contained
+    Also trys to construct words that won't be contained, by shuffling
+    the words taken from the grid.
     """
-    length = int(sqrt(len(grid_string)))
-    grid = Grid(grid_string, axis_length=length, window_size=0)
-    length = len(grid.rows)
+    generator = default_rng(seed)  # type: Generator
+    height, width = grid.shape
 
     words = {}  # type: Dict[str, bool]
-    for _ in range(amount):
-        axis = choice(choice((grid.rows, grid.columns)))  # type: str
-        index = randrange(length)  # type: int
+    scrambled = []  # type: List[str]
+    for vertical in generator.random(amount) < 0.5:
+        lines, length = (width, height) if vertical else (height, width)
+        line = int(generator.integers(lines))  # type: int
+        start = int(generator.integers(length))  # type: int
+        end = start + 1 + int(generator.integers(min(MAX_WORD_LENGTH, length - start)))  # type: int
 
-        in_word = axis[
-            index:index + randrange(1, min(MAX_WORD_LENGTH, (length - index)))
-        ]  # type: str
+        letters = grid[start:end, line] if vertical else grid[line, start:end]  # type: ndarray
+        in_word = letters.tobytes().decode('ascii')  # type: str
         words[in_word] = True
 
-        out_word = ''.join(sample(in_word, len(in_word)))  # type: str
-        words[out_word] = grid.linear_search(out_word)
+        out_word = generator.permutation(letters).tobytes().decode('ascii')  # type: str
+        words.setdefault(out_word, False)
+        scrambled.append(out_word)
+
+    for word in find_present(grid, (word for word in scrambled if not words[word])):
+        words[word] = True
 
     return words
 
 
-def write_words(path: Path, amount: int, grid: str, json: bool) -> None:
+def write_words(
+            path: Path,
+            amount: int,
+            grid: 'ndarray',
+            json: bool,
+            seed: 'Optional[int]' = None,
+        ) -> None:
     """ Writes the list of words to a file. """
-    words = generate_words(grid, amount)  # type: Dict[str, bool]
+    words = generate_words(grid, amount, seed)  # type: Dict[str, bool]
     if json:
         with path.open('r') as file:
             all_json = load(file)
@@ -78,15 +248,16 @@ def write_words(path: Path, amount: int, grid: str, json: bool) -> None:
 
 
 def parse_grid(arguments: 'ParsedArguments') -> None:
-    write_grid(arguments.path, arguments.size)
+    write_grid(arguments.path, arguments.size, arguments.seed)
 
 
 def parse_words(arguments: 'ParsedArguments') -> None:
     write_words(
         arguments.path,
         arguments.amount,
-        read_grid(arguments.grid),
+        map_grid(arguments.grid),
         arguments.json,
+        arguments.seed,
     )
 
 if __name__ == '__main__':
@@ -131,5 +302,12 @@ if __name__ == '__main__':
     )
     words_parser.set_defaults(function=parse_words)
 
+    for subparser in (grid_parser, words_parser):
+        subparser.add_argument(
+            '--seed',
+            type=int,
+            help='Seed the generator so the same output is created each time.',
+        )
+
     arguments = parser.parse_args()  # type: ParsedArguments
     arguments.function(arguments)
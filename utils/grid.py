@@ -1,20 +1,68 @@
 from typing import TYPE_CHECKING
-from ctypes import c_wchar_p
-from itertools import product
-from multiprocessing import Pool, RawArray
+from ctypes import c_long
+from functools import partial
+from itertools import chain, product
+from multiprocessing import Pool, RawValue
+from re import compile, escape
+
+from numpy import frombuffer, int64, packbits, uint8, zeros
+
+from utils.automaton import Automaton
+from utils.backend import Backend, check_cell
+from utils.instrumentation import phase, progress
+from utils.shared import SharedGrid
+from utils.text import joined_lines
 
 
 if TYPE_CHECKING:
-    from typing import Iterator, List, Optional, Tuple
-    from ctypes import Array
+    from typing import Iterable, Iterator, List, Optional, Pattern, Set, Tuple, Union
+    from multiprocessing.pool import Pool as PoolType
+
+    from numpy import ndarray
+
+    from utils.backend import Cell
+    from utils.files import GridData
+
+    SharedCounter = c_long
+    NGrams = Tuple[bytearray, ...]
+    Axes = Tuple[memoryview, ...]
+    Lines = Union[bytearray, memoryview]
+    Words = Tuple[str, ...]
+
+
+WORD_BATCH_SIZE = 1000  # type: int
+NGRAM_LENGTH = 5  # type: int
+NGRAM_BLOCK_SIZE = 2**20  # type: int
+LETTERS = 26  # type: int
+FIRST_LETTER = ord('a')  # type: int
+
+
+def _search(lines: bytes, word: str, axis_length: int) -> bool:
+    """ Check if word is in lines of axis_length letters joined together.
+
+    The lines are searched all at once, and matches running over the end
+    of a line into the next are skipped.
+    """
+    if not word:
+        return True
+    try:
+        key = word.encode('ascii')  # type: bytes
+    except UnicodeEncodeError:
+        return False
+
+    index = lines.find(key)  # type: int
+    while index != -1:
+        if index // axis_length == (index + len(key) - 1) // axis_length:
+            return True
+        index = lines.find(key, index + 1)
 
-    SharedAxes = Array[c_wchar_p]
-    Axes = Tuple[str, ...]
+    return False
 
 
 class _GridWorker:
-    _axes = None  # type: Optional[Tuple[Axes, ...]]
+    _grid = None  # type: Optional[SharedGrid]
     _window_size = None  # type: Optional[int]
+    _cancelled = None  # type: Optional[SharedCounter]
 
     @classmethod
     def test(cls):
@@ -23,40 +71,107 @@ class _GridWorker:
     @classmethod
     def share_data(
                 cls,
-                rows: 'SharedAxes',
-                columns: 'SharedAxes',
-                window_size: int
+                grid: 'SharedGrid',
+                window_size: int,
+                cancelled: 'Optional[SharedCounter]' = None,
             ) -> None:
-        """ Share data with workers."""
-        cls._axes = tuple(
-            tuple(axis)
-            for axis in (rows, columns)
-        )
+        """ Share data with workers.
+
+        The grid is attached to by name when the worker is spawned, so its
+        lines are never copied.
+        """
+        cls._grid = grid
         cls._window_size = window_size
+        cls._cancelled = cancelled
 
     @classmethod
-    def contains_word(cls, word: str, search_index: int) -> bool:
-        """ Check if word is contained in axes. """
+    def is_cancelled(cls, query: 'Optional[int]') -> bool:
+        """ Check if the query has already been answered by another worker. """
+        if query is None or cls._cancelled is None:
+            return False
+
+        return cls._cancelled.value >= query
+
+    @classmethod
+    def _find(cls, pattern: 'Pattern[bytes]', length: int, start: int, end: int) -> bool:
+        """ Check for a match between start and end that doesn't run over the end of a line.
+
+        The shared buffer is searched in place, so no task copies its window.
+        """
+        axis_length = cls._grid.axis_length  # type: int
+        match = pattern.search(cls._grid.buffer, start, end)
+        while match is not None:
+            first = match.start()  # type: int
+            if first // axis_length == (first + length - 1) // axis_length:
+                return True
+            match = pattern.search(cls._grid.buffer, first + 1, end)
+
+        return False
+
+    @classmethod
+    def _contains(cls, word: str, search_index: int, query: 'Optional[int]' = None) -> bool:
+        """ Check if word is in the rows or columns of the window starting at search_index. """
+        if not word:
+            return True
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return False
+
+        pattern = compile(escape(key))  # type: Pattern[bytes]
+        axis_length = cls._grid.axis_length  # type: int
+        lines = min(cls._window_size, axis_length - search_index)  # type: int
+        for axis in range(cls._grid.axes):
+            if cls.is_cancelled(query):
+                return False
+            start = (axis*axis_length + search_index) * axis_length  # type: int
+            if cls._find(pattern, len(key), start, start + lines*axis_length):
+                return True
+
+        return False
+
+    @classmethod
+    def contains_word(
+                cls,
+                word: str,
+                search_index: int,
+                query: 'Optional[int]' = None,
+            ) -> bool:
+        """ Check if word is contained in axes.
+
+        Gives up early, returning False, once the query is cancelled.
+        """
         none_attrs = (
             attr is None
-            for attr in (cls._axes, cls._window_size)
+            for attr in (cls._grid, cls._window_size)
         )  # type: Iterator[bool]
         if any(none_attrs):
             raise RuntimeError('Data has not been shared with workers')
 
-        for axis in cls._axes:
-            for index in range(search_index, search_index + cls._window_size):
-                if word in axis[index]:
-                    return True
+        return cls._contains(word, search_index, query)
 
-        return False
+    @classmethod
+    def contains_words(cls, words: 'Words', search_index: int) -> 'Set[str]':
+        """ Find which of the words are contained in axes. """
+        none_attrs = (
+            attr is None
+            for attr in (cls._grid, cls._window_size)
+        )  # type: Iterator[bool]
+        if any(none_attrs):
+            raise RuntimeError('Data has not been shared with workers')
+
+        return {
+            word
+            for word in words
+            if cls._contains(word, search_index)
+        }
 
 
-class Grid:
+class Grid(Backend):
 
     def __init__(
                 self,
-                grid: str,
+                grid: 'GridData',
                 axis_length: int,
                 window_size: int,
                 multiprocessing: bool,
@@ -65,66 +180,218 @@ class Grid:
         self._window_size = window_size  # type: int
         self._multiprocessing = multiprocessing  # type: bool
 
-        print('Loading Grid: ...', end='\r')
+        progress('Loading Grid: ...', end='\r')
         if len(grid) != self._axis_length**2:
             raise RuntimeError('grid is not the right size!')
+        if isinstance(grid, str):
+            grid = grid.encode('ascii')
 
-        self.rows = self._generate_rows(grid)  # type: Axes
-        self.columns = self._generate_columns()  # type: Axes
+        with phase('grid.ngrams', bytes=len(grid)):
+            self._ngrams = self._generate_ngrams(grid)  # type: Optional[NGrams]
+        with phase('grid.lines', items=2*self._axis_length, bytes=2*len(grid)):
+            self._lines = joined_lines(grid, self._axis_length)  # type: Lines
+        # Only made while a pool is running, so serial searches don't need
+        # shared memory. The lines are then kept only in the shared copy.
+        self._shared = None  # type: Optional[SharedGrid]
 
-        self._shared_rows = self._share_axes(self.rows)  # type:SharedAxes
-        self._shared_columns = self._share_axes(self.columns)  # type: SharedAxes
-        print('Loading Grid: DONE')
+        self._cancelled = RawValue(c_long, 0)  # type: SharedCounter
+        self._queries = 0  # type: int
+        self._pool = None  # type: Optional[PoolType]
+        progress('Loading Grid: DONE')
 
-    def _generate_rows(self, grid: str) -> 'Axes':
-        """ Split grid into rows. """
-        return tuple(
-            grid[self._axis_length*row:self._axis_length*(row + 1)]
-            for row in range(self._axis_length)
-        )
+    def _line(self, axis: int, index: int) -> memoryview:
+        """ View a row, or a column when axis is 1, in the buffer of lines. """
+        start = (axis*self._axis_length + index) * self._axis_length  # type: int
+        return memoryview(self._lines)[start:start + self._axis_length]
+
+    @property
+    def rows(self) -> 'Axes':
+        """ The rows, as views of the buffer of lines. """
+        return tuple(self._line(0, row) for row in range(self._axis_length))
+
+    @property
+    def columns(self) -> 'Axes':
+        """ The columns, as views of the buffer of lines. """
+        return tuple(self._line(1, column) for column in range(self._axis_length))
+
+    def _generate_ngrams(self, grid: bytes) -> 'Optional[NGrams]':
+        """ Create a bit table per length n, up to NGRAM_LENGTH, of the n-grams in the grid.
+
+        Bit k of the nth table is set when the n letters numbered by the
+        base LETTERS digits of k appear in a row or column. Grids holding
+        anything other than lowercase letters aren't filtered.
+        """
+        length = self._axis_length  # type: int
+        codes = frombuffer(grid, dtype=uint8).reshape(length, length)  # type: ndarray
+        if codes.size and (codes.min() < FIRST_LETTER or codes.max() >= FIRST_LETTER + LETTERS):
+            return None
+
+        tables = [
+            zeros(LETTERS**size, dtype=bool)
+            for size in range(1, NGRAM_LENGTH + 1)
+        ]  # type: List[ndarray]
+        block = max(1, NGRAM_BLOCK_SIZE // max(1, length))  # type: int
+        for axes in (codes, codes.T):
+            for start in range(0, length, block):
+                lines = axes[start:start + block].astype(int64) - FIRST_LETTER  # type: ndarray
+                keys = lines  # type: ndarray
+                for size, table in enumerate(tables, 1):
+                    if size > 1:
+                        keys = keys[:, :-1] * LETTERS + lines[:, size - 1:]
+                    table[keys.ravel()] = True
 
-    def _generate_columns(self) -> 'Axes':
-        """ Transpose rows to get columns. """
         return tuple(
-            ''.join(column)
-            for column in zip(*self.rows)
+            bytearray(packbits(table, bitorder='little'))
+            for table in tables
         )
 
-    def _share_axes(self, axes: 'Axes') -> 'SharedAxes':
-        """ Create in memory array for storing and sharing axes. """
-        return RawArray(c_wchar_p, axes)
+    def _passes_filter(self, word: str) -> bool:
+        """ Check every n-gram of the word is in the grid, rejecting most missing words. """
+        if self._ngrams is None or not word:
+            return True
+
+        size = min(len(word), NGRAM_LENGTH)  # type: int
+        table = self._ngrams[size - 1]  # type: bytearray
+        window = LETTERS**(size - 1)  # type: int
+
+        key = 0  # type: int
+        for index, letter in enumerate(word):
+            code = ord(letter) - FIRST_LETTER  # type: int
+            if not 0 <= code < LETTERS:
+                return False
+
+            key = key % window * LETTERS + code
+            if index >= size - 1 and not table[key >> 3] >> (key & 7) & 1:
+                return False
+
+        return True
+
+    def _add_ngrams(self, line: memoryview, index: int) -> None:
+        """ Add the n-grams of line passing through index to the tables. """
+        if self._ngrams is None:
+            return
+
+        for size, table in enumerate(self._ngrams, 1):
+            for start in range(max(0, index - size + 1), min(index, len(line) - size) + 1):
+                key = 0  # type: int
+                for letter in line[start:start + size]:
+                    key = key * LETTERS + letter - FIRST_LETTER
+                table[key >> 3] |= 1 << (key & 7)
+
+    def apply_patch(self, cells: 'Iterable[Cell]') -> None:
+        """ Change the letters of cells, given as (row, column, letter).
+
+        Each cell is written to its row and its column in the buffer of
+        lines, and the n-grams through the cells are added to the filter.
+        N-grams no longer in the grid are kept, which only means fewer
+        words are rejected early. While a pool is running the lines are
+        the shared copy, so it sees the cells without being restarted.
+        """
+        cells = list(cells)
+        for row, column, letter in cells:
+            check_cell(row, column, letter, self._axis_length)
+
+        for row, column, letter in cells:
+            self._lines[row*self._axis_length + column] = ord(letter)
+            self._lines[(self._axis_length + column)*self._axis_length + row] = ord(letter)
+            self._add_ngrams(self._line(0, row), column)
+            self._add_ngrams(self._line(1, column), row)
+
+    def _get_pool(self) -> 'PoolType':
+        """ Start the worker pool, moving the lines into memory the workers attach to once. """
+        if self._pool is None:
+            with phase('grid.share', bytes=len(self._lines)):
+                self._shared = SharedGrid.create(self._lines, self._axis_length, axes=2)
+                self._lines = self._shared.buffer[:len(self._lines)]
+            self._pool = Pool(
+                initializer=_GridWorker.share_data,
+                initargs=(
+                    self._shared,
+                    self._window_size,
+                    self._cancelled,
+                ),
+            )
+
+        return self._pool
 
     def _linear_search(self, word: str) -> bool:
-        """ Iterates through rows and columns and checks for word presence. """
-        for row, column in zip(self.rows, self.columns):
-            if word in row:
-                return True
-            elif word in column:
-                return True
-        return False
+        """ Searches every row and then every column at once for the word. """
+        return _search(self._lines, word, self._axis_length)
 
     def _multiprocess_search(self, word: str) -> bool:
-        """ Checks for word presence using multiple processes. """
-        worker = _GridWorker()  # type: _GridWorker
-        worker.share_data(
-            self._shared_rows,
-            self._shared_columns,
-            self._window_size,
-        )
+        """ Checks for word presence using multiple processes.
 
-        with Pool() as pool:
-            results = pool.starmap(
-                worker.contains_word,
-                product(
-                    (word,),
-                    range(0, self._axis_length, self._window_size),
-                ),
-            )  # type: List[bool]
+        Returns as soon as any window holds the word. Every query has its
+        own number, and marking it as cancelled makes the workers skip the
+        windows they haven't finished searching.
+        """
+        self._queries += 1
+        query = self._queries  # type: int
+
+        try:
+            for result in self._get_pool().imap_unordered(
+                        partial(_GridWorker.contains_word, word, query=query),
+                        range(0, self._axis_length, self._window_size),
+                    ):
+                if result:
+                    return True
+        finally:
+            self._cancelled.value = query
+
+        return False
+
+    def _multiprocess_find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Find words using multiple processes, sending them in batches. """
+        unique = tuple(set(words))  # type: Words
+        batches = (
+            unique[index:index + WORD_BATCH_SIZE]
+            for index in range(0, len(unique), WORD_BATCH_SIZE)
+        )  # type: Iterator[Words]
+
+        found = set()  # type: Set[str]
+        for result in self._get_pool().starmap(
+                    _GridWorker.contains_words,
+                    product(
+                        batches,
+                        range(0, self._axis_length, self._window_size),
+                    ),
+                ):
+            found |= result
+
+        return found
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Find which words are contained within the Grid in one pass. """
+        words = [
+            word
+            for word in words
+            if self._passes_filter(word)
+        ]
+        if self._multiprocessing:
+            return self._multiprocess_find_all(words)
+
+        automaton = Automaton(words)  # type: Automaton
+
+        return automaton.search(
+            bytes(line).decode('ascii')
+            for line in chain(self.rows, self.columns)
+        )
 
-            return any(results)
+    def close(self) -> None:
+        """ Shut down the worker pool if one was started, freeing its shared memory. """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shared is not None:
+            # Copied back out, so the lines outlive the shared memory.
+            self._lines = bytearray(self._lines)
+            self._shared = None
 
     def __contains__(self, word: str) -> bool:
         """ Check if the word is contained within the Grid. """
+        if not self._passes_filter(word):
+            return False
         if self._multiprocessing:
             return self._multiprocess_search(word)
         else:
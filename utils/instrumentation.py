@@ -0,0 +1,123 @@
+from typing import TYPE_CHECKING
+import sys
+from atexit import register
+from contextlib import contextmanager, nullcontext
+from json import dump
+from os import environ
+from resource import RUSAGE_SELF, getrusage
+from time import perf_counter
+
+
+if TYPE_CHECKING:
+    from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple
+
+    Counts = Dict[str, int]
+    Phase = Dict[str, Any]
+    Report = Dict[str, Any]
+
+
+ENVIRONMENT_VARIABLE = 'WORDSEARCH_INSTRUMENT'  # type: str
+STDERR = '-'  # type: str
+DISABLED_VALUES = ('', '0', 'false')  # type: Tuple[str, ...]
+
+
+_phases = {}  # type: Dict[str, Phase]
+_output = None  # type: Optional[str]
+_registered = False  # type: bool
+
+
+def peak_memory() -> int:
+    """ The most bytes of memory this process has used at once. """
+    peak = getrusage(RUSAGE_SELF).ru_maxrss  # type: int
+
+    # ru_maxrss is in bytes on macOS, but kilobytes elsewhere.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def enabled() -> bool:
+    """ Whether phases are being recorded. """
+    return _output is not None
+
+
+def enable(output: str = STDERR) -> None:
+    """ Record phases, writing them as JSON to the output file, or - for stderr, on exit. """
+    global _output, _registered
+
+    _output = output
+    if not _registered:
+        register(write_report)
+        _registered = True
+
+
+def disable() -> None:
+    """ Stop recording phases and forget those recorded. """
+    global _output
+
+    _output = None
+    _phases.clear()
+
+
+@contextmanager
+def _record(name: str, counts: 'Counts') -> 'Iterator[Counts]':
+    started = perf_counter()  # type: float
+    try:
+        yield counts
+    finally:
+        seconds = perf_counter() - started  # type: float
+
+        phase = _phases.setdefault(name, {
+            'calls': 0,
+            'seconds': 0.0,
+            'max_seconds': 0.0,
+        })  # type: Phase
+        phase['calls'] += 1
+        phase['seconds'] += seconds
+        phase['max_seconds'] = max(phase['max_seconds'], seconds)
+        for key, value in counts.items():
+            phase[key] = phase.get(key, 0) + value
+        phase['peak_bytes'] = peak_memory()
+
+
+def phase(name: str, **counts: int) -> 'ContextManager[Counts]':
+    """ Time a phase, adding its duration and counts to every other call of it.
+
+    The counts yielded can be added to once they're known. Nothing is
+    recorded unless instrumentation is enabled.
+    """
+    if _output is None:
+        return nullcontext({})
+
+    return _record(name, counts)
+
+
+def progress(message: str, end: str = '\n') -> None:
+    """ Show progress on stderr, only when enabled so it stays out of the results. """
+    if _output is not None:
+        print(message, end=end, file=sys.stderr, flush=True)
+
+
+def report() -> 'Report':
+    """ The phases recorded so far, with the peak memory of the process. """
+    return {
+        'phases': _phases,
+        'peak_bytes': peak_memory(),
+    }
+
+
+def write_report() -> None:
+    """ Write the report as JSON to the output chosen when enabled. """
+    if _output is None:
+        return
+
+    if _output == STDERR:
+        # Looked up when writing, so redirecting stderr is respected.
+        dump(report(), sys.stderr)
+        sys.stderr.write('\n')
+    else:
+        with open(_output, 'w') as file:
+            dump(report(), file, indent=2)
+
+
+_setting = environ.get(ENVIRONMENT_VARIABLE, '')  # type: str
+if _setting.lower() not in DISABLED_VALUES:
+    enable(STDERR if _setting == '1' else _setting)
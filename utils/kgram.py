@@ -0,0 +1,115 @@
+from typing import TYPE_CHECKING
+
+from numpy import concatenate, frombuffer, searchsorted, uint8, uint64, unique
+
+from utils.backend import Backend
+from utils.instrumentation import progress
+from utils.storage import index_path, load_index, save_index
+
+
+if TYPE_CHECKING:
+    from typing import List, Optional
+    from pathlib import Path
+
+    from numpy import ndarray
+
+    from utils.files import GridData
+    from utils.storage import Arrays
+
+    Table = ndarray
+
+
+BITS_PER_LETTER = 5  # type: int
+MAX_PACKED_LENGTH = 64 // BITS_PER_LETTER  # type: int
+FIRST_CODE = ord('a') - 1  # type: int
+
+
+class KGramIndex(Backend):
+
+    def __init__(
+                self,
+                grid: 'GridData',
+                axis_length: int,
+                max_word: int,
+                index_dir: 'Optional[Path]' = None,
+            ) -> None:
+        self._axis_length = axis_length  # type: int
+        self._max_length = min(max_word, MAX_PACKED_LENGTH, axis_length)  # type: int
+
+        progress('Packing k-grams: ...', end='\r')
+        if len(grid) != self._axis_length**2:
+            raise RuntimeError('grid is not the right size!')
+        if isinstance(grid, str):
+            grid = grid.encode('ascii')
+
+        names = [
+            'length_{}'.format(length)
+            for length in range(1, self._max_length + 1)
+        ]  # type: List[str]
+
+        path = None  # type: Optional[Path]
+        arrays = None  # type: Optional[Arrays]
+        if index_dir is not None:
+            path = index_path(
+                index_dir,
+                'kgram',
+                grid,
+                axis_length=axis_length,
+                max_word=self._max_length,
+            )
+            arrays = load_index(path, names)
+
+        if arrays is not None:
+            self._tables = [arrays[name] for name in names]  # type: List[Table]
+        else:
+            self._tables = self._pack_grid(grid)
+            if path is not None:
+                save_index(path, dict(zip(names, self._tables)))
+        progress('Packing k-grams: DONE')
+
+    def _pack_grid(self, grid: bytes) -> 'List[Table]':
+        """ Create a sorted table of every packed k-gram for each length k.
+
+        Letters take BITS_PER_LETTER bits each, from 1 for 'a', so the
+        k-grams of every row are one shift and OR of the (k - 1)-grams.
+        """
+        length = self._axis_length  # type: int
+        codes = frombuffer(grid, dtype=uint8).reshape(length, length) - FIRST_CODE  # type: ndarray
+        codes = codes.astype(uint64)
+
+        tables = []  # type: List[Table]
+        rows, columns = codes, codes.T.copy()
+        for size in range(1, self._max_length + 1):
+            if size > 1:
+                rows = rows[:, :-1] << uint64(BITS_PER_LETTER) | codes[:, size - 1:]
+                columns = columns[:, :-1] << uint64(BITS_PER_LETTER) | codes.T[:, size - 1:]
+
+            tables.append(unique(concatenate((rows.ravel(), columns.ravel()))))
+
+        return tables
+
+    def _pack_word(self, word: str) -> int:
+        """ Pack the word the same way as the grid's k-grams. """
+        packed = 0  # type: int
+        for letter in word:
+            code = ord(letter) - FIRST_CODE  # type: int
+            if not 0 < code <= 26:
+                return -1
+            packed = packed << BITS_PER_LETTER | code
+
+        return packed
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is a k-gram of the grid by binary search. """
+        if not word:
+            return True
+        if len(word) > self._max_length:
+            return False
+
+        packed = self._pack_word(word)  # type: int
+        if packed < 0:
+            return False
+
+        table = self._tables[len(word) - 1]  # type: Table
+        index = searchsorted(table, uint64(packed))  # type: int
+        return index < len(table) and table.item(index) == packed
@@ -0,0 +1,147 @@
+from typing import TYPE_CHECKING
+from importlib import import_module
+from os import sysconf
+
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+    from utils.backend import Backend
+
+    BackendEntry = Tuple[str, str, Tuple[str, ...]]
+    Cost = Callable[[int, int], float]
+
+
+AUTO = 'auto'  # type: str
+DEFAULT_BACKEND = 'grid'  # type: str
+
+BACKENDS = {
+    'grid': ('utils.grid', 'Grid', ('axis_length', 'window_size', 'multiprocessing')),
+    'trie': (
+        'utils.trie',
+        'Trie',
+        ('axis_length', 'window_size', 'max_word', 'multiprocessing', 'index_dir'),
+    ),
+    'kgram': ('utils.kgram', 'KGramIndex', ('axis_length', 'max_word', 'index_dir')),
+    'suffix_array': ('utils.suffix', 'SuffixArray', ('axis_length', 'index_dir')),
+    'bitset': ('utils.bitset', 'BitGrid', ('axis_length',)),
+    'anchored': ('utils.anchor', 'AnchoredGrid', ('axis_length',)),
+    'tiled': ('utils.tiles', 'TiledGrid', ('max_word',)),
+    'all_directions': ('utils.directions', 'DirectionalGrid', ('axis_length',)),
+}  # type: Dict[str, BackendEntry]
+
+# Seconds to build each backend and to check one word, from the number of
+# cells in the grid and the maximum word length, measured on a 1000x1000
+# grid. Backends that find other words than the Grid, or that need a grid
+# file, are never picked automatically.
+BUILD_COSTS = {
+    'grid': lambda cells, max_word: 1e-7 * cells,
+    'trie': lambda cells, max_word: 1.6e-7 * cells * max_word,
+    'kgram': lambda cells, max_word: 5e-8 * cells * max_word,
+    'suffix_array': lambda cells, max_word: 1.5e-6 * cells,
+    'bitset': lambda cells, max_word: 2e-8 * cells,
+    'anchored': lambda cells, max_word: 1e-8 * cells,
+}  # type: Dict[str, Cost]
+QUERY_COSTS = {
+    'grid': lambda cells, max_word: 2e-10 * cells,
+    'trie': lambda cells, max_word: 1e-6,
+    'kgram': lambda cells, max_word: 5e-6,
+    'suffix_array': lambda cells, max_word: 1e-5,
+    'bitset': lambda cells, max_word: 3e-10 * cells,
+    'anchored': lambda cells, max_word: 1e-9 * cells,
+}  # type: Dict[str, Cost]
+MEMORY_COSTS = {
+    'grid': lambda cells, max_word: 3 * cells,
+    'trie': lambda cells, max_word: 112 * min(2 * cells * max_word, 26**max_word),
+    'kgram': lambda cells, max_word: 16 * cells * max_word,
+    'suffix_array': lambda cells, max_word: 40 * cells,
+    'bitset': lambda cells, max_word: 7 * cells,
+    'anchored': lambda cells, max_word: 5 * cells,
+}  # type: Dict[str, Cost]
+MAX_WORD_LIMITS = {
+    'trie': 8,
+    'kgram': 12,
+}  # type: Dict[str, int]
+POOL_COST = 0.1  # type: float
+TASK_COST = 1e-3  # type: float
+
+
+def register_backend(name: str, module: str, attribute: str, parameters: 'Tuple[str, ...]') -> None:
+    """ Add a backend, imported from module only once it is used. """
+    BACKENDS[name] = (module, attribute, parameters)
+
+
+def load_backend(name: str) -> 'Type[Backend]':
+    """ Import the module of a backend and return its class. """
+    if name not in BACKENDS:
+        raise RuntimeError('Unknown backend: {}'.format(name))
+
+    module, attribute, _ = BACKENDS[name]
+    return getattr(import_module(module), attribute)
+
+
+def create_backend(name: str, grid: 'Any', **options: 'Any') -> 'Backend':
+    """ Create a backend, passing it only the options it takes. """
+    _, _, parameters = BACKENDS[name]
+
+    return load_backend(name)(
+        grid,
+        **{
+            parameter: options[parameter]
+            for parameter in parameters
+        }
+    )
+
+
+def estimate_cost(name: str, cells: int, words: int, max_word: int, cores: int) -> 'Tuple[float, bool]':
+    """ Estimate the seconds a backend takes to check words, and if multiprocessing helps. """
+    build = BUILD_COSTS[name](cells, max_word)  # type: float
+    query = QUERY_COSTS[name](cells, max_word)  # type: float
+
+    costs = [(build + words * query, False)]  # type: List[Tuple[float, bool]]
+    if cores > 1 and name == 'grid':
+        costs.append((build + POOL_COST + words * (query / cores + TASK_COST), True))
+    elif cores > 1 and name == 'trie':
+        costs.append((build / cores + POOL_COST + words * query, True))
+
+    return min(costs)
+
+
+def physical_memory() -> 'Optional[int]':
+    """ The bytes of memory in the machine, if it can be found. """
+    try:
+        return sysconf('SC_PAGE_SIZE') * sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError):
+        return None
+
+
+def choose_backend(
+            cells: int,
+            words: int,
+            max_word: int,
+            cores: int,
+            memory: 'Optional[int]' = None,
+        ) -> 'Tuple[str, bool]':
+    """ Pick the backend, and whether to use multiprocessing, expected to be quickest.
+
+    Backends expected to need more than memory bytes are left out, apart
+    from the Grid which is always a candidate.
+    """
+    candidates = [
+        name
+        for name in BUILD_COSTS
+        if max_word <= MAX_WORD_LIMITS.get(name, max_word)
+        and (
+            name == DEFAULT_BACKEND
+            or memory is None
+            or MEMORY_COSTS[name](cells, max_word) <= memory
+        )
+    ]  # type: List[str]
+
+    costs = {
+        name: estimate_cost(name, cells, words, max_word, cores)
+        for name in candidates
+    }  # type: Dict[str, Tuple[float, bool]]
+    name = min(candidates, key=lambda name: costs[name][0])  # type: str
+
+    return name, costs[name][1]
@@ -0,0 +1,147 @@
+from typing import TYPE_CHECKING
+from json import dumps, loads
+from queue import Empty, Queue
+from socketserver import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+from threading import Event, Thread
+from time import monotonic
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Set
+
+    from wordsearch import WordSearch
+
+    Request = Dict[str, Any]
+    Response = Dict[str, Any]
+
+
+BATCH_DELAY = 0.002  # type: float
+FIND_ALL_THRESHOLD = 64  # type: int
+
+
+class _PendingQuery:
+
+    def __init__(self, words: 'List[str]') -> None:
+        self.words = words  # type: List[str]
+        self.found = None  # type: Optional[Set[str]]
+        self.error = None  # type: Optional[str]
+        self.done = Event()  # type: Event
+
+
+class _Batcher:
+
+    def __init__(self, search: 'WordSearch', delay: float) -> None:
+        self._search = search  # type: WordSearch
+        self._delay = delay  # type: float
+        self._queue = Queue()  # type: Queue[_PendingQuery]
+
+        self._thread = Thread(target=self._run, daemon=True)  # type: Thread
+        self._thread.start()
+
+    def query(self, words: 'List[str]') -> '_PendingQuery':
+        """ Queue words to be searched with any others arriving at the same time. """
+        pending = _PendingQuery(words)  # type: _PendingQuery
+        self._queue.put(pending)
+        pending.done.wait()
+
+        return pending
+
+    def _collect(self) -> 'List[_PendingQuery]':
+        """ Wait for a query, then gather those arriving within the batch delay. """
+        batch = [self._queue.get()]  # type: List[_PendingQuery]
+        deadline = monotonic() + self._delay  # type: float
+
+        while True:
+            try:
+                batch.append(self._queue.get(timeout=max(0, deadline - monotonic())))
+            except Empty:
+                return batch
+
+    def _run(self) -> None:
+        """ Answer every batch of queries with one search. """
+        while True:
+            batch = self._collect()  # type: List[_PendingQuery]
+            words = {
+                word
+                for pending in batch
+                for word in pending.words
+            }  # type: Set[str]
+
+            try:
+                if len(words) < FIND_ALL_THRESHOLD:
+                    found = {
+                        word
+                        for word in words
+                        if self._search.is_present(word)
+                    }  # type: Set[str]
+                else:
+                    found = self._search.find_all(words)
+            except Exception as error:
+                for pending in batch:
+                    pending.error = str(error)
+                    pending.done.set()
+                continue
+
+            for pending in batch:
+                pending.found = found
+                pending.done.set()
+
+
+class _QueryHandler(StreamRequestHandler):
+    server = None  # type: QueryServer
+
+    def handle(self) -> None:
+        """ Answer each line of JSON sent over the connection with a line of JSON.
+
+        A line that isn't a valid request is answered with an error, and
+        the connection stays open for the next one.
+        """
+        for line in self.rfile:
+            try:
+                response = self.server.respond(loads(line.decode('utf-8')))  # type: Response
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                response = {'error': 'Invalid request: {}'.format(error)}
+            self.wfile.write(dumps(response).encode('utf-8') + b'\n')
+
+
+class QueryServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+                self,
+                address: str,
+                searches: 'Dict[str, WordSearch]',
+                batch_delay: float = BATCH_DELAY,
+            ) -> None:
+        self._batchers = {
+            name: _Batcher(search, batch_delay)
+            for name, search in searches.items()
+        }  # type: Dict[str, _Batcher]
+
+        super().__init__(address, _QueryHandler)
+
+    def respond(self, request: 'Request') -> 'Response':
+        """ Check which of the words in the request are in the requested grid.
+
+        The grid can be left out when only one grid is being served.
+        """
+        name = request.get('grid')  # type: Optional[str]
+        if name is None and len(self._batchers) == 1:
+            name = next(iter(self._batchers))
+        if name not in self._batchers:
+            return {'error': 'Unknown grid: {}'.format(name)}
+
+        words = request.get('words')  # type: Any
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            return {'error': 'words must be a list of strings'}
+
+        pending = self._batchers[name].query(words)  # type: _PendingQuery
+        if pending.found is None:
+            return {'error': pending.error}
+
+        return {
+            'found': [
+                word in pending.found
+                for word in words
+            ],
+        }
@@ -0,0 +1,87 @@
+from typing import TYPE_CHECKING
+from multiprocessing.shared_memory import SharedMemory
+from os import getpid
+from weakref import finalize
+
+from numpy import frombuffer, uint8
+
+
+if TYPE_CHECKING:
+    from typing import Callable, Optional, Tuple
+
+    from numpy import ndarray
+
+    from utils.files import GridData
+
+
+def _release(memory: SharedMemory, owner: 'Optional[int]') -> None:
+    """ Free the shared memory, only unlinking it from the process which created it. """
+    if owner == getpid():
+        memory.unlink()
+    try:
+        memory.close()
+    except BufferError:
+        # Arrays still view it, and it's unmapped once they're gone.
+        pass
+
+
+class SharedGrid:
+
+    def __init__(self, memory: SharedMemory, axis_length: int, axes: int, owner: 'Optional[int]') -> None:
+        self._memory = memory  # type: SharedMemory
+        self.axis_length = axis_length  # type: int
+        self.axes = axes  # type: int
+        finalize(self, _release, memory, owner)
+
+    @classmethod
+    def create(cls, grid: 'GridData', axis_length: int, axes: int = 1) -> 'SharedGrid':
+        """ Copy the grid into a new block of shared memory.
+
+        The grid holds the rows one after another, followed by the columns
+        when axes is 2, so each line is a contiguous slice of the buffer.
+        """
+        if isinstance(grid, str):
+            grid = grid.encode('ascii')
+
+        size = axes * axis_length**2  # type: int
+        memory = SharedMemory(create=True, size=max(1, size))  # type: SharedMemory
+        memory.buf[:size] = memoryview(grid)[:size]
+
+        return cls(memory, axis_length, axes, getpid())
+
+    @classmethod
+    def attach(cls, name: str, axis_length: int, axes: int) -> 'SharedGrid':
+        """ Map a grid created by another process, without copying it. """
+        return cls(SharedMemory(name), axis_length, axes, None)
+
+    @property
+    def name(self) -> str:
+        """ The name other processes attach to the grid by. """
+        return self._memory.name
+
+    @property
+    def buffer(self) -> memoryview:
+        """ The lines of the grid as one buffer. """
+        return self._memory.buf
+
+    def lines(self) -> 'ndarray':
+        """ View the rows, then the columns if they're stored, as an array of letters.
+
+        The memory can't be unmapped while a view of it is kept, so views
+        shouldn't outlive the grid.
+        """
+        return frombuffer(
+            self._memory.buf,
+            dtype=uint8,
+            count=self.axes * self.axis_length**2,
+        ).reshape(self.axes * self.axis_length, self.axis_length)
+
+    def set_cell(self, row: int, column: int, letter: str) -> None:
+        """ Change the letter of a cell, in its column too if they're stored. """
+        self._memory.buf[row*self.axis_length + column] = ord(letter)
+        if self.axes == 2:
+            self._memory.buf[(self.axis_length + column)*self.axis_length + row] = ord(letter)
+
+    def __reduce__(self) -> 'Tuple[Callable[..., SharedGrid], Tuple[str, int, int]]':
+        """ Attach to the same memory when sent to a spawned process, rather than copying it. """
+        return SharedGrid.attach, (self.name, self.axis_length, self.axes)
@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+from hashlib import sha256
+from json import dumps
+from os import rename
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from numpy import load, save
+
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Optional
+
+    from numpy import ndarray
+
+    from utils.files import GridData
+
+    Arrays = Dict[str, ndarray]
+
+
+# Bumped whenever an index holds different arrays, so older ones are ignored.
+FORMAT_VERSION = 2  # type: int
+
+
+def index_path(
+            directory: Path,
+            kind: str,
+            grid: 'GridData',
+            **parameters: int
+        ) -> Path:
+    """ Locate the saved index of kind built from grid with parameters. """
+    if isinstance(grid, str):
+        grid = grid.encode('ascii')
+
+    digest = sha256(dumps(parameters, sort_keys=True).encode('ascii'))
+    digest.update(grid)
+
+    return directory / '{}-v{}-{}'.format(
+        kind,
+        FORMAT_VERSION,
+        digest.hexdigest(),
+    )
+
+
+def load_index(path: Path, names: 'Iterable[str]') -> 'Optional[Arrays]':
+    """ Memory map the arrays of a saved index if it exists. """
+    try:
+        return {
+            name: load(str(path / (name + '.npy')), mmap_mode='r')
+            for name in names
+        }
+    except FileNotFoundError:
+        return None
+
+
+def _holds(path: Path, names: 'Iterable[str]') -> bool:
+    """ Whether a saved index has every one of the arrays named. """
+    return all(
+        (path / (name + '.npy')).is_file()
+        for name in names
+    )
+
+
+def save_index(path: Path, arrays: 'Arrays') -> None:
+    """ Save the arrays of an index.
+
+    The arrays are written to a staging directory that is renamed into
+    place, so a partially written index is never loaded. An index already
+    saved is kept, unless it is missing some of the arrays.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(mkdtemp(prefix='.' + path.name, dir=str(path.parent)))  # type: Path
+
+    try:
+        for name, array in arrays.items():
+            save(str(staging / (name + '.npy')), array)
+
+        try:
+            rename(str(staging), str(path))
+        except OSError:
+            if not path.is_dir():
+                raise
+            if not _holds(path, arrays):
+                rmtree(str(path))
+                rename(str(staging), str(path))
+    finally:
+        if staging.exists():
+            rmtree(str(staging))
@@ -0,0 +1,136 @@
+from typing import TYPE_CHECKING
+
+from numpy import (
+    argsort,
+    concatenate,
+    cumsum,
+    empty,
+    full,
+    int32,
+    int64,
+    lexsort,
+    unique,
+)
+
+from utils.backend import Backend
+from utils.instrumentation import progress
+from utils.storage import index_path, load_index, save_index
+from utils.text import SEPARATOR, separated_lines
+
+
+if TYPE_CHECKING:
+    from typing import Optional
+    from pathlib import Path
+
+    from numpy import ndarray
+
+    from utils.files import GridData
+    from utils.storage import Arrays
+
+    Text = ndarray
+    Suffixes = ndarray
+
+
+class SuffixArray(Backend):
+
+    def __init__(
+                self,
+                grid: 'GridData',
+                axis_length: int,
+                index_dir: 'Optional[Path]' = None,
+            ) -> None:
+        self._axis_length = axis_length  # type: int
+
+        progress('Building suffix array: ...', end='\r')
+        if len(grid) != self._axis_length**2:
+            raise RuntimeError('grid is not the right size!')
+
+        text = separated_lines(grid, axis_length)  # type: Text
+        self._text = text.tobytes()  # type: bytes
+
+        path = None  # type: Optional[Path]
+        arrays = None  # type: Optional[Arrays]
+        if index_dir is not None:
+            path = index_path(
+                index_dir,
+                'suffix',
+                grid,
+                axis_length=axis_length,
+            )
+            arrays = load_index(path, ('suffixes',))
+
+        if arrays is not None:
+            self._suffixes = arrays['suffixes']  # type: Suffixes
+        else:
+            self._suffixes = self._sort_suffixes(text)
+            if path is not None:
+                save_index(path, {'suffixes': self._suffixes})
+        progress('Building suffix array: DONE')
+
+    def _sort_suffixes(self, text: 'Text') -> 'Suffixes':
+        """ Sort the suffixes of text by prefix doubling.
+
+        Every round sorts the suffixes by the ranks of their first k
+        characters and the k characters after those, doubling k until
+        every rank is unique. Pairs of ranks are sorted by lexsort rather
+        than packed into one key, which could collide or overflow.
+        """
+        size = len(text)  # type: int
+        ranks = unique(text, return_inverse=True)[1].astype(int64)  # type: ndarray
+        order = argsort(ranks, kind='stable')  # type: ndarray
+
+        span = 1  # type: int
+        while span < size:
+            following = full(size, -1, dtype=int64)  # type: ndarray
+            following[:size - span] = ranks[span:]
+
+            order = lexsort((following, ranks))
+            sorted_ranks = ranks[order]  # type: ndarray
+            sorted_following = following[order]  # type: ndarray
+
+            ranks = empty(size, dtype=int64)
+            ranks[order] = concatenate((
+                [0],
+                cumsum(
+                    (sorted_ranks[1:] != sorted_ranks[:-1])
+                    | (sorted_following[1:] != sorted_following[:-1])
+                ),
+            ))
+            if ranks[order[-1]] == size - 1:
+                break
+
+            span *= 2
+
+        return order.astype(int32 if size < 2**31 else int64)
+
+    def _lower_bound(self, key: bytes) -> int:
+        """ Find the first suffix that isn't less than key. """
+        text, suffixes = self._text, self._suffixes
+        width = len(key)  # type: int
+
+        low, high = 0, len(suffixes)
+        while low < high:
+            middle = (low + high) // 2  # type: int
+            start = suffixes.item(middle)  # type: int
+            if text[start:start + width] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained within the SuffixArray. """
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return False
+        if SEPARATOR in key:
+            return False
+
+        index = self._lower_bound(key)  # type: int
+        if index == len(self._suffixes):
+            return False
+
+        start = self._suffixes.item(index)  # type: int
+        return self._text[start:start + len(key)] == key
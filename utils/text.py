@@ -0,0 +1,62 @@
+from typing import TYPE_CHECKING
+
+from numpy import frombuffer, full, uint8
+
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+    from utils.files import GridData
+
+
+SEPARATOR = ord('\n')  # type: int
+TRANSPOSE_BLOCK_SIZE = 1024  # type: int
+
+
+def transpose(rows: 'ndarray', columns: 'ndarray') -> None:
+    """ Copy the transpose of rows into columns, a square block at a time.
+
+    Each block is read and written while it's still in the cache, rather
+    than reading down a whole column of rows for every line written.
+    """
+    height, width = rows.shape
+    for row in range(0, height, TRANSPOSE_BLOCK_SIZE):
+        for column in range(0, width, TRANSPOSE_BLOCK_SIZE):
+            columns[
+                column:column + TRANSPOSE_BLOCK_SIZE,
+                row:row + TRANSPOSE_BLOCK_SIZE,
+            ] = rows[
+                row:row + TRANSPOSE_BLOCK_SIZE,
+                column:column + TRANSPOSE_BLOCK_SIZE,
+            ].T
+
+
+def joined_lines(grid: 'GridData', axis_length: int) -> bytearray:
+    """ Join every row and then every column, with nothing between them. """
+    if isinstance(grid, str):
+        grid = grid.encode('ascii')
+
+    text = bytearray(2 * axis_length**2)  # type: bytearray
+    rows = frombuffer(grid, dtype=uint8, count=axis_length**2).reshape(
+        axis_length,
+        axis_length,
+    )  # type: ndarray
+    lines = frombuffer(text, dtype=uint8).reshape(2*axis_length, axis_length)  # type: ndarray
+    lines[:axis_length] = rows
+    transpose(rows, lines[axis_length:])
+
+    return text
+
+
+def separated_lines(grid: 'GridData', axis_length: int) -> 'ndarray':
+    """ Join every row and then every column, each ending in SEPARATOR. """
+    if isinstance(grid, str):
+        grid = grid.encode('ascii')
+
+    rows = frombuffer(grid, dtype=uint8).reshape(axis_length, axis_length)  # type: ndarray
+
+    text = full((2*axis_length, axis_length + 1), SEPARATOR, dtype=uint8)  # type: ndarray
+    text[:axis_length, :axis_length] = rows
+    text[axis_length:, :axis_length] = rows.T
+
+    return text.reshape(-1)
@@ -0,0 +1,141 @@
+from typing import TYPE_CHECKING
+from math import sqrt
+
+from numpy import ascontiguousarray, flatnonzero, memmap, uint8
+from numpy.lib.stride_tricks import as_strided
+
+from utils.automaton import Automaton
+from utils.backend import Backend
+
+
+if TYPE_CHECKING:
+    from typing import Iterable, Iterator, Optional, Set, Tuple
+    from pathlib import Path
+
+    from numpy import ndarray
+
+    Tile = ndarray
+
+
+TILE_SIZE = 4096  # type: int
+SCAN_SIZE = 2**20  # type: int
+NEWLINE = ord('\n')  # type: int
+CARRIAGE_RETURN = ord('\r')  # type: int
+
+
+def _measure(mapped: 'ndarray', width: 'Optional[int]') -> 'Tuple[int, int, int]':
+    """ Find the width, distance between rows and height of the grid file.
+
+    Rows are either ended by a newline, or, if the file has none, width
+    letters long. Without a width a file with no newlines is square.
+    """
+    size = len(mapped)  # type: int
+
+    newline = -1  # type: int
+    for start in range(0, size, SCAN_SIZE):
+        found = flatnonzero(mapped[start:start + SCAN_SIZE] == NEWLINE)  # type: ndarray
+        if found.size:
+            newline = start + found.item(0)
+            break
+
+    if newline >= 0:
+        stride = newline + 1  # type: int
+        if newline and mapped[newline - 1] == CARRIAGE_RETURN:
+            newline -= 1
+        width = newline
+    else:
+        if width is None:
+            width = int(sqrt(size))
+        stride = width
+        if not width or size % width:
+            raise RuntimeError('grid is not the right size!')
+
+    return width, stride, (size - width) // stride + 1
+
+
+def map_grid(path: 'Path', width: 'Optional[int]' = None) -> 'ndarray':
+    """ Memory map a grid file as a read only array of letters, one row per line. """
+    if path.stat().st_size == 0:
+        raise RuntimeError('grid is empty!')
+
+    mapped = memmap(path, dtype=uint8, mode='r')  # type: ndarray
+    width, stride, height = _measure(mapped, width)
+
+    return as_strided(
+        mapped,
+        shape=(height, width),
+        strides=(stride, 1),
+        writeable=False,
+    )
+
+
+class TiledGrid(Backend):
+
+    def __init__(
+                self,
+                path: 'Path',
+                max_word: int,
+                width: 'Optional[int]' = None,
+                tile_size: int = TILE_SIZE,
+            ) -> None:
+        self._max_word = max_word  # type: int
+        self._tile_size = tile_size  # type: int
+
+        self._grid = map_grid(path, width)  # type: ndarray
+        self._height, self._width = self._grid.shape
+
+    def _tiles(self) -> 'Iterator[Tuple[Tile, int, int]]':
+        """ Split the grid into tiles, with the number of their rows and columns that start words.
+
+        Tiles overlap the next by max_word - 1 letters so every word
+        starting within a tile also ends within it.
+        """
+        overlap = self._max_word - 1  # type: int
+        size = self._tile_size  # type: int
+
+        for row in range(0, self._height, size):
+            for column in range(0, self._width, size):
+                tile = self._grid[
+                    row:row + size + overlap,
+                    column:column + size + overlap,
+                ]  # type: Tile
+                yield (
+                    tile,
+                    min(size, self._height - row),
+                    min(size, self._width - column),
+                )
+
+    def _lines(self) -> 'Iterator[bytes]':
+        """ The rows and then the columns of each tile, read one tile at a time. """
+        for tile, rows, columns in self._tiles():
+            for line in tile[:rows]:
+                yield line.tobytes()
+            for line in ascontiguousarray(tile[:, :columns].T):
+                yield line.tobytes()
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Find which words are contained within the grid in one pass over the tiles. """
+        automaton = Automaton(
+            word
+            for word in words
+            if len(word) <= self._max_word
+        )  # type: Automaton
+
+        return automaton.search(
+            line.decode('ascii')
+            for line in self._lines()
+        )
+
+    def __contains__(self, word: str) -> bool:
+        """ Check if the word is contained within the grid, one tile at a time. """
+        try:
+            key = word.encode('ascii')  # type: bytes
+        except UnicodeEncodeError:
+            return False
+        if len(key) > self._max_word:
+            return False
+
+        return any(
+            key in line
+            for line in self._lines()
+        )
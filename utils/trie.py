@@ -1,78 +1,230 @@
 from typing import TYPE_CHECKING
-from ctypes import c_char
+from heapq import heappop, heappush
 from itertools import product
-from multiprocessing import Pool, RawArray
-
-from numpy import fromstring, frombuffer, copyto
+from multiprocessing import Pool
+
+from numpy import (
+    arange,
+    bincount,
+    concatenate,
+    full,
+    int32,
+    int64,
+    isin,
+    uint8,
+    unique,
+    zeros,
+)
+from numpy.lib.stride_tricks import as_strided
+
+from utils.backend import Backend, check_cell
+from utils.instrumentation import phase, progress
+from utils.shared import SharedGrid
+from utils.storage import index_path, load_index, save_index
 
 
 if TYPE_CHECKING:
-    from typing import Iterator, List, Optional, Set, Tuple, Type
-    from ctypes import Array, _CDataMeta as CType
+    from typing import Iterable, Iterator, List, Optional, Set, Sized, Tuple, Type
     from multiprocessing.pool import Pool as PoolType
+    from pathlib import Path
 
     from numpy import ndarray
 
-    SharedGridArray = Array[c_char]
-    GridDType = Tuple[CType, Tuple[int]]
-    GridShape = Tuple[int, int]
+    from utils.backend import Cell
+    from utils.files import GridData
+    from utils.storage import Arrays
+
     Grid = Type[ndarray]
     Range = Tuple[int, int]
+    Sequences = ndarray
+    Children = ndarray
+    Edges = ndarray
+    Counts = ndarray
+    CountedEdges = Tuple[Edges, Counts]
+    Letters = Tuple[int, ...]
+    # The row and column a word starts at, and whether it runs down.
+    Window = Tuple[int, int, bool]
+
+
+LETTERS = 26  # type: int
+FIRST_LETTER = ord('a')  # type: int
+END = LETTERS  # type: int
+
+
+class _TrieArray:
+
+    def __init__(self, children: 'Children', counts: 'Counts') -> None:
+        self._children = children  # type: Children
+        self._counts = counts  # type: Counts
+        self._size = len(children)  # type: int
+        self._free = []  # type: List[int]
+
+    @staticmethod
+    def edges(sequences: 'Sequences') -> 'CountedEdges':
+        """ Find the edges of the Trie of sequences in bulk, one level at a time.
+
+        Each row of sequences is a word of letter codes padded with END.
+        The edge leading to node n is stored at n - 1 as the flat index,
+        parent * LETTERS + letter, of that node in the table of children.
+        The children of a level are numbered in order of their edge, so
+        every node of a level is created by one call to unique, which also
+        counts the sequences passing through each node.
+        """
+        alive = arange(len(sequences))  # type: ndarray
+        parents = zeros(len(sequences), dtype=int64)  # type: ndarray
+        levels = []  # type: List[Edges]
+        counts = []  # type: List[Counts]
+        size = 1  # type: int
+
+        for depth in range(sequences.shape[1]):
+            codes = sequences[alive, depth]  # type: ndarray
+            present = codes != END  # type: ndarray
+            alive = alive[present]
+            if alive.size == 0:
+                break
+
+            keys = parents[present] * LETTERS + codes[present]  # type: ndarray
+            level, inverse, level_counts = unique(
+                keys,
+                return_inverse=True,
+                return_counts=True,
+            )
+            levels.append(level)
+            counts.append(level_counts)
+
+            parents = inverse + size
+            size += level.size
+
+        if not levels:
+            return zeros(0, dtype=int64), zeros(0, dtype=int64)
+
+        return concatenate(levels), concatenate(counts)
+
+    @classmethod
+    def from_edges(cls, edges: 'CountedEdges') -> '_TrieArray':
+        """ Build the table of children from the edges of a Trie. """
+        edges, counts = edges
+        children = zeros((len(edges) + 1, LETTERS), dtype=int32)  # type: Children
+        children.reshape(-1)[edges] = arange(1, len(edges) + 1)
 
+        return cls(children, concatenate(([0], counts)))
 
-class _TrieDict(dict):
+    @classmethod
+    def from_sequences(cls, sequences: 'Sequences') -> '_TrieArray':
+        """ Build the Trie of sequences. """
+        return cls.from_edges(cls.edges(sequences))
 
-    def add_children(self, children: 'Grid') -> None:
-        """ Recursively add an array of children. """
-        if children.size != 0:
-            self._add_child(children[0], children[1:])
+    @classmethod
+    def join(cls, tries: 'Iterable[CountedEdges]') -> '_TrieArray':
+        """ Join the edges of tries holding words with different first letters.
 
-    def _add_child(self, character: bytes, children: 'Grid') -> None:
-        """ Add a child and its children. """
-        character_string = character.decode('utf-8')
+        The nodes of each trie, apart from its root, are numbered after
+        those already joined, so joining only offsets the parents of its
+        edges.
+        """
+        blocks = []  # type: List[Edges]
+        counts = []  # type: List[Counts]
+        first_letters = set()  # type: Set[int]
+        size = 1  # type: int
+
+        for edges, edge_counts in tries:
+            parents = edges // LETTERS  # type: ndarray
+            roots = parents == 0  # type: ndarray
+
+            letters = set((edges[roots] % LETTERS).tolist())  # type: Set[int]
+            if letters & first_letters:
+                raise RuntimeError('Tries share a first letter!')
+            first_letters |= letters
+
+            blocks.append(
+                edges + (roots == 0) * ((size - 1) * LETTERS)
+            )
+            counts.append(edge_counts)
+            size += len(edges)
+
+        if not blocks:
+            return cls.from_edges((zeros(0, dtype=int64), zeros(0, dtype=int64)))
+
+        return cls.from_edges((concatenate(blocks), concatenate(counts)))
+
+    def _new_node(self) -> int:
+        """ Reuse a removed node, or add one, growing the table when it is full. """
+        if self._free:
+            node = self._free.pop()  # type: int
+            self._children[node] = 0
+            return node
+
+        if self._size == len(self._children):
+            capacity = 2 * len(self._children)  # type: int
+            children = zeros((capacity, LETTERS), dtype=int32)  # type: Children
+            children[:self._size] = self._children
+            counts = zeros(capacity, dtype=int64)  # type: Counts
+            counts[:self._size] = self._counts
+            self._children, self._counts = children, counts
+
+        self._size += 1
+        return self._size - 1
+
+    def _make_writeable(self) -> None:
+        """ Copy arrays memory mapped from a saved index before changing them. """
+        if not self._children.flags.writeable:
+            self._children = self._children.copy()
+        if not self._counts.flags.writeable:
+            self._counts = self._counts.copy()
+
+    def add(self, sequence: 'List[int]') -> None:
+        """ Count one more occurrence of sequence, and of each of its prefixes. """
+        self._make_writeable()
+
+        node = 0  # type: int
+        for code in sequence:
+            child = self._children.item(node, code)  # type: int
+            if not child:
+                child = self._new_node()
+                self._children[node, code] = child
+            self._counts[child] += 1
+            node = child
+
+    def remove(self, sequence: 'List[int]') -> None:
+        """ Count one less occurrence of sequence, and of each of its prefixes.
+
+        Nodes left without an occurrence are unlinked. Nothing below them
+        can have an occurrence either, so the rest of the nodes unlinked
+        are on the path of sequence.
+        """
+        self._make_writeable()
 
-        try:
-            node = self[character_string]  # type: _TrieDict
-        except KeyError:
-            node = _TrieDict()  # type: _TrieDict
+        node = 0  # type: int
+        for code in sequence:
+            child = self._children.item(node, code)  # type: int
+            self._counts[child] -= 1
+            if not self._counts[child]:
+                self._children[node, code] = 0
+                self._free.append(child)
+            node = child
 
-        node.add_children(children)
+    def __len__(self) -> int:
+        """ The number of nodes in the TrieArray. """
+        return self._size - len(self._free)
 
-        self[character_string] = node
+    def __contains__(self, word: str) -> bool:
+        """ Checks if a word is contained within the TrieArray. """
+        children = self._children  # type: Children
+        node = 0  # type: int
+        for character in word:
+            code = ord(character) - FIRST_LETTER  # type: int
+            if not 0 <= code < LETTERS:
+                return False
 
-    def __or__(self, other: '_TrieDict') -> '_TrieDict':
-        """ Merge two TrieDicts.
+            node = children.item(node, code)
+            if not node:
+                return False
 
-        Keeps the structure of both intact.
-        """
-        both = self.keys() & other.keys()  # type: Set[str]
-        for child in both:
-            node = self[child] | other[child]  # type: _TrieDict
-            self[child] = node
-
-        unique = other.keys() - both  # type: Set[str]
-        for child in unique:
-            node = other[child]  # type: _TrieDict
-            self[child] = node
-
-        return self
-
-    def __contains__(self, word: 'List[str]') -> bool:
-        """ Checks if a word is contained within the TrieDict. """
-        character, *remaining = word
-        if character in self.keys():
-            if remaining:
-                return remaining in self[character]
-            else:
-                return True
-        else:
-            return False
+        return True
 
 
 class _TrieWorker:
-    _grid = None  # type: Optional[SharedGridArray]
-    _shape = None  # type: Optional[GridShape]
-    _dtype = None  # type: Optional[GridDType]
+    _grid = None  # type: Optional[SharedGrid]
     _window_size =  None  # type: Optional[int]
     _axis_length = None  # type: Optional[int]
     _max_word_length = None  # type: Optional[int]
@@ -80,139 +232,222 @@ class _TrieWorker:
     @classmethod
     def share_data(
                 cls,
-                grid: 'SharedGridArray',
-                shape: 'GridShape',
-                dtype: 'GridDType',
+                grid: 'SharedGrid',
                 window_size: int,
-                axis_length: int,
                 max_word_length: int
             ) -> None:
-        """ Share data with workers."""
+        """ Share data with workers.
+
+        The grid is attached to by name when the worker is spawned, so it's
+        never copied.
+        """
         cls._grid = grid
-        cls._shape = shape
-        cls._dtype = dtype
         cls._window_size = window_size
-        cls._axis_length = axis_length
+        cls._axis_length = grid.axis_length
         cls._max_word_length = max_word_length
 
     @classmethod
-    def iterate_window(cls, ranges: 'Range') -> '_TrieDict':
-        """Iterate through a given range and generate a Trie for that range. """
+    def clear_data(cls) -> None:
+        """ Forget the data shared with this process. """
+        cls._grid = None
+        cls._window_size = None
+        cls._axis_length = None
+        cls._max_word_length = None
+
+    @classmethod
+    def iterate_window(
+                cls,
+                ranges: 'Range',
+                first_letters: 'Optional[Letters]' = None,
+            ) -> 'Sequences':
+        """ Extract the possible words starting in a given range.
+
+        Returns the words as rows of letter codes padded with END, only
+        keeping those starting with first_letters if they are given.
+        """
         none_attrs = (
             attr is None
-            for attr in (cls._grid, cls._shape, cls._dtype, cls._window_size,
-                         cls._axis_length, cls._max_word_length,
-                         )
+            for attr in (cls._grid, cls._window_size, cls._axis_length, cls._max_word_length)
         )  # type: Iterator[bool]
         if any(none_attrs):
             raise RuntimeError('Data has not been shared with workers')
 
-        grid = frombuffer(cls._grid, dtype=cls._dtype).reshape(cls._shape)  # type: Grid
+        grid = cls._grid.lines()  # type: Grid
 
         x, y = ranges
-        node = _TrieDict()  # type: _TrieDict
-        for i in range(x, x + cls._window_size):
-            for j in range(y, y + cls._window_size):
-                node.add_children(
-                    grid[i, j:min(cls._axis_length, j + cls._max_word_length)]
-                )
-                node.add_children(
-                    grid[i:min(cls._axis_length, i + cls._max_word_length), j]
-                )
+        rows = min(cls._window_size, cls._axis_length - x)  # type: int
+        columns = min(cls._window_size, cls._axis_length - y)  # type: int
+        overlap = cls._max_word_length - 1  # type: int
+
+        block = grid[x:x + rows + overlap, y:y + columns + overlap]  # type: Grid
+        region = full(
+            (rows + overlap, columns + overlap),
+            END,
+            dtype=uint8,
+        )  # type: Grid
+        region[:block.shape[0], :block.shape[1]] = block - FIRST_LETTER
+
+        shape = (rows, columns, cls._max_word_length)
+        row_stride, column_stride = region.strides
+        horizontal = as_strided(
+            region,
+            shape=shape,
+            strides=(row_stride, column_stride, column_stride),
+        )  # type: ndarray
+        vertical = as_strided(
+            region,
+            shape=shape,
+            strides=(row_stride, column_stride, row_stride),
+        )  # type: ndarray
+
+        if first_letters is not None:
+            starts = isin(region[:rows, :columns], first_letters)  # type: ndarray
+            return concatenate((horizontal[starts], vertical[starts]))
+
+        return concatenate((
+            horizontal.reshape(-1, cls._max_word_length),
+            vertical.reshape(-1, cls._max_word_length),
+        ))
+
+    @classmethod
+    def fill_letters(cls, first_letters: 'Letters') -> 'CountedEdges':
+        """ Find the edges of the Trie of the words starting with first_letters. """
+        if cls._axis_length is None or cls._window_size is None:
+            raise RuntimeError('Data has not been shared with workers')
+
+        window_ranges = product(
+            range(0, cls._axis_length, cls._window_size),
+            range(0, cls._axis_length, cls._window_size),
+        )  # type: Iterator[Range]
+        sequences = concatenate([
+            cls.iterate_window(ranges, first_letters)
+            for ranges in window_ranges
+        ])  # type: Sequences
 
-        return node
+        return _TrieArray.edges(sequences)
 
 
-class Trie:
+class Trie(Backend):
 
     def __init__(
                 self,
-                grid: str,
+                grid: 'GridData',
                 axis_length: int,
                 window_size: int,
                 max_word: int,
                 multiprocessing: bool,
+                index_dir: 'Optional[Path]' = None,
             ) -> None:
         self._axis_length = axis_length  # type: int
-        self._shape = (axis_length,)*2  # type: GridShape
-        self._dtype = (c_char, (1,))  # type: GridDType
-
-        self._grid = self._load_grid(grid)  # type: SharedGridArray
-
-        print('Iterating through windows.')
-        print('WARNING: This can take a while!')
-        if multiprocessing:
-            self._root = self._non_linear_fill(window_size, max_word)
+        self._max_word = max_word  # type: int
+
+        with phase('trie.share', bytes=axis_length**2):
+            self._grid = self._load_grid(grid)  # type: SharedGrid
+
+        path = None  # type: Optional[Path]
+        arrays = None  # type: Optional[Arrays]
+        if index_dir is not None:
+            path = index_path(
+                index_dir,
+                'trie',
+                grid,
+                axis_length=axis_length,
+                max_word=max_word,
+            )
+            arrays = load_index(path, ('children', 'counts'))
+
+        if arrays is not None:
+            progress('Loaded Trie from {}'.format(path))
+            self._root = _TrieArray(arrays['children'], arrays['counts'])  # type: _TrieArray
         else:
-            self._root = self._linear_fill(max_word)
-        print('Done')
-
-    def _load_grid(self, grid: str) -> 'SharedGridArray':
+            progress('Iterating through windows.')
+            progress('WARNING: This can take a while!')
+            with phase('trie.fill', bytes=axis_length**2) as counts:
+                if multiprocessing:
+                    self._root = self._non_linear_fill(window_size, max_word)
+                else:
+                    self._root = self._linear_fill(max_word)
+                counts['items'] = len(self._root)
+            progress('Done')
+
+            if path is not None:
+                save_index(path, {
+                    'children': self._root._children,
+                    'counts': self._root._counts,
+                })
+
+    def _load_grid(self, grid: 'GridData') -> 'SharedGrid':
         """ Load the grid into shared memory. """
-        size = self._axis_length**2
-        if len(grid) != size:
+        if len(grid) != self._axis_length**2:
             raise RuntimeError("Not enough words!")
 
-        grid_array = RawArray(c_char, size)  # type: SharedGridArray
-        shared_grid = frombuffer(
-            grid_array,
-            dtype=self._dtype,
-        ).reshape(self._shape)  # type: Grid
-        copyto(shared_grid, self._format_grid(grid, size))
-
-        return grid_array
-
-    def _format_grid(self, grid: str, size: int) -> 'Grid':
-        """ Load the grid from the string. """
-        return fromstring(
-            grid,
-            dtype=self._dtype,
-            count=size,
-        ).reshape(self._shape)
+        return SharedGrid.create(grid, self._axis_length)
 
-    def _non_linear_fill(self, window_size: int, max_word: int) -> '_TrieDict':
-        """ Fill the trie with the possible words from the grid. """
-        root = _TrieDict()  # type: _TrieDict
+    def _non_linear_fill(self, window_size: int, max_word: int) -> '_TrieArray':
+        """ Fill the trie with the possible words from the grid.
 
-        window_ranges = list(product(
-            range(0, self._axis_length, window_size),
-            range(0, self._axis_length, window_size),
-        ))  # List[Range]
-
-        worker = _TrieWorker()  # type: _TrieWorker
-        worker.share_data(
-            self._grid,
-            self._shape,
-            self._dtype,
-            window_size,
-            self._axis_length,
-            max_word,
-        )
+        Each worker finds the edges of the Trie of the words starting with
+        its own group of letters, so the tries never overlap and are joined
+        without merging any nodes.
+        """
+        tries = []  # type: List[CountedEdges]
 
         i = 0
-        with Pool() as pool:
-            chunk_size = self._calculate_chunksize(pool, window_ranges)  # type: int
-
-            for node in pool.imap_unordered(
-                        worker.iterate_window,
-                        window_ranges,
+        with Pool(
+                    initializer=_TrieWorker.share_data,
+                    initargs=(
+                        self._grid,
+                        window_size,
+                        max_word,
+                    ),
+                ) as pool:
+            groups = self._partition_letters(len(pool._pool))  # type: List[Letters]
+            chunk_size = self._calculate_chunksize(pool, groups)  # type: int
+
+            for edges in pool.imap_unordered(
+                        _TrieWorker.fill_letters,
+                        groups,
                         chunksize=chunk_size
                     ):
                 i += 1
 
-                print('Merging node:', i, end='\r')
-                root = root | node
-            print('.'*16, end='\r')
-            print('Merging: Done')
+                progress('Collecting letters: {}'.format(i), end='\r')
+                tries.append(edges)
+            progress('.'*24, end='\r')
+            progress('Collecting: Done')
 
         pool.join()
 
-        return root
+        with phase('trie.join', items=len(tries)):
+            return _TrieArray.join(tries)
+
+    def _partition_letters(self, groups: int) -> 'List[Letters]':
+        """ Split the letters into groups with similar amounts of the grid. """
+        counts = bincount(
+            self._grid.lines().reshape(-1) - FIRST_LETTER,
+            minlength=LETTERS,
+        )  # type: ndarray
+
+        heap = [
+            (0, group, ())
+            for group in range(min(groups, LETTERS))
+        ]  # type: List[Tuple[int, int, Letters]]
+        for letter in sorted(range(LETTERS), key=counts.item, reverse=True):
+            if not counts[letter]:
+                continue
+            total, group, letters = heappop(heap)
+            heappush(heap, (total + counts.item(letter), group, letters + (letter,)))
+
+        return [
+            letters
+            for _, _, letters in sorted(heap, key=lambda item: item[1])
+            if letters
+        ]
 
     def _calculate_chunksize(
                 self,
                 pool: 'PoolType',
-                ranges: 'List[Range]'
+                ranges: 'Sized'
             ) -> int:
         """ Calculate the chunk size to use for batching processes. """
         chunk_size, extra = divmod(len(ranges), len(pool._pool) * 4)
@@ -221,19 +456,60 @@ class Trie:
 
         return chunk_size
 
-    def _linear_fill(self, max_word: int) -> '_TrieDict':
+    def _linear_fill(self, max_word: int) -> '_TrieArray':
         worker = _TrieWorker()  # type: _TrieWorker
-        worker.share_data(
-            self._grid,
-            self._shape,
-            self._dtype,
-            self._axis_length,
-            self._axis_length,
-            max_word,
-        )
+        worker.share_data(self._grid, self._axis_length, max_word)
+
+        try:
+            return _TrieArray.from_sequences(worker.iterate_window((0,0)))
+        finally:
+            worker.clear_data()
+
+    def _windows(self, cells: 'List[Cell]') -> 'List[Window]':
+        """ The rows and columns of words of up to max_word letters passing through cells. """
+        windows = set()  # type: Set[Window]
+        for row, column, _ in cells:
+            windows.update(
+                (row, start, False)
+                for start in range(max(0, column - self._max_word + 1), column + 1)
+            )
+            windows.update(
+                (start, column, True)
+                for start in range(max(0, row - self._max_word + 1), row + 1)
+            )
+
+        return sorted(windows)
+
+    def _window(self, grid: 'Grid', window: 'Window') -> 'List[int]':
+        """ The letter codes of the word of up to max_word letters starting a window. """
+        row, column, vertical = window
+        if vertical:
+            letters = grid[row:row + self._max_word, column]  # type: Grid
+        else:
+            letters = grid[row, column:column + self._max_word]
+
+        return [letter - FIRST_LETTER for letter in letters.tolist()]
 
-        return worker.iterate_window((0,0))
+    def apply_patch(self, cells: 'Iterable[Cell]') -> None:
+        """ Change the letters of cells, given as (row, column, letter).
+
+        Only the words passing through the cells are taken out of the Trie
+        and the new ones put in, so updating takes time in proportion to
+        the number of cells and max_word, not the size of the grid.
+        """
+        cells = list(cells)
+        for row, column, letter in cells:
+            check_cell(row, column, letter, self._axis_length)
+
+        grid = self._grid.lines()  # type: Grid
+        windows = self._windows(cells)  # type: List[Window]
+        for window in windows:
+            self._root.remove(self._window(grid, window))
+        for row, column, letter in cells:
+            grid[row, column] = ord(letter)
+        for window in windows:
+            self._root.add(self._window(grid, window))
 
     def __contains__(self, word: str) -> bool:
         """ Check if the word is contained within the Trie. """
-        return list(word) in self._root
+        return word in self._root
@@ -1,14 +1,38 @@
 #! /usr/bin/env python3
 from typing import TYPE_CHECKING
 from argparse import ArgumentParser
+from os import cpu_count
 from pathlib import Path
+from sys import stdout
 
-from utils import Grid, read_grid, read_words, Trie
+from utils.cache import CACHE_SIZE, LRUCache
+from utils.files import (
+    WORD_CHUNK_SIZE,
+    count_words,
+    iter_words,
+    read_grid_bytes,
+    read_words,
+    write_results,
+)
+from utils.instrumentation import STDERR, enable, phase
+from utils.registry import (
+    AUTO,
+    BACKENDS,
+    DEFAULT_BACKEND,
+    choose_backend,
+    create_backend,
+    physical_memory,
+)
+from utils.server import QueryServer
 
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Union
+    from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
     from argparse import Namespace as ParsedArguments
+    from types import TracebackType
+
+    from utils.backend import Backend, Cell, Location
+    from utils.files import GridData, Result
 
 
 ROW_LENGTH = 10000 # type: int
@@ -20,37 +44,215 @@ class WordSearch(object):
 
     def __init__(
                 self,
-                grid: str,
+                grid: 'Union[GridData, Path]',
                 use_trie: bool = False,
                 multiprocessing: bool = False,
                 axis_length: int = ROW_LENGTH,
                 window_size: int = WINDOW_SIZE,
-                max_word: int = MAX_WORD_LENGTH
+                max_word: int = MAX_WORD_LENGTH,
+                use_suffix_array: bool = False,
+                index_dir: 'Optional[Path]' = None,
+                all_directions: bool = False,
+                use_anchors: bool = False,
+                use_bitsets: bool = False,
+                use_kgrams: bool = False,
+                use_tiles: bool = False,
+                cache_size: 'Optional[int]' = CACHE_SIZE,
+                backend: 'Optional[str]' = None,
+                word_count: 'Optional[int]' = None,
             ) -> None:
-        self._cache = {}  # type: Dict[str, bool]
-        self._use_trie = use_trie  # type: bool
-        if self._use_trie:
-            self._data = Trie(
-                grid,
-                axis_length,
-                window_size,
+        structures = {
+            'trie': use_trie,
+            'suffix_array': use_suffix_array,
+            'all_directions': all_directions,
+            'anchored': use_anchors,
+            'bitset': use_bitsets,
+            'kgram': use_kgrams,
+            'tiled': use_tiles,
+        }  # type: Dict[str, bool]
+        chosen = [
+            name
+            for name, used in structures.items()
+            if used
+        ] + ([backend] if backend is not None else [])  # type: List[str]
+        if len(chosen) > 1:
+            raise RuntimeError('Only one data structure can be used!')
+
+        self.backend = chosen[0] if chosen else DEFAULT_BACKEND  # type: str
+        if (self.backend == 'tiled') != isinstance(grid, Path):
+            raise RuntimeError('Tiles, and only tiles, read the grid from a file!')
+        if self.backend == AUTO:
+            # Without a word count, such as when serving, assume as many
+            # words as cells so building an index can pay for itself.
+            self.backend, multiprocessing = choose_backend(
+                len(grid),
+                word_count if word_count is not None else len(grid),
                 max_word,
-                multiprocessing,
-            )  # type: Union[Grid, Trie]
-        else:
-            self._data = Grid(
-                grid,
-                axis_length,
-                window_size,
-                multiprocessing,
-            )  # type: Union[Grid, Trie]
+                cpu_count() or 1,
+                physical_memory(),
+            )
+
+        self._grid = grid  # type: Union[GridData, Path]
+        # The letters patched into each cell, only applied to a copy of the
+        # grid when a locator has to be built from it.
+        self._patches = {}  # type: Dict[Tuple[int, int], str]
+        self._axis_length = axis_length  # type: int
+        self._locator = None  # type: Optional[Backend]
+        self._cache = LRUCache(cache_size)  # type: LRUCache
+        self._data = create_backend(
+            self.backend,
+            grid,
+            axis_length=axis_length,
+            window_size=window_size,
+            max_word=max_word,
+            multiprocessing=multiprocessing,
+            index_dir=index_dir,
+        )  # type: Backend
 
     def is_present(self, word: str) -> bool:
         """ Checks if word is present in grid. """
-        if word not in self._cache:
-            self._cache[word] = word in self._data
+        with phase('search', words=1):
+            return self._cache.lookup(word, self._data.__contains__)
+
+    def cache_stats(self) -> 'Dict[str, int]':
+        """ The hits, misses and evictions of the is_present cache. """
+        return self._cache.stats()
+
+    def find_all(self, words: 'Iterable[str]') -> 'Set[str]':
+        """ Checks which of the words are present in grid. """
+        with phase('search.batch') as counts:
+            found = self._data.find_all(words)  # type: Set[str]
+            counts['found'] = len(found)
+
+        return found
+
+    def _get_locator(self) -> 'Backend':
+        """ The data structure answering locate.
+
+        Unless the data structure can locate words itself, the positions
+        of the letters are indexed the first time a word is located.
+        """
+        if self._locator is None:
+            if self._data.locates:
+                self._locator = self._data
+            elif isinstance(self._grid, Path):
+                raise RuntimeError('Words can only be located in a grid held in memory!')
+            else:
+                with phase('locate.index'):
+                    self._locator = create_backend(
+                        'anchored',
+                        self._patched_grid(),
+                        axis_length=self._axis_length,
+                    )
+
+        return self._locator
+
+    def _patched_grid(self) -> 'GridData':
+        """ The grid with every patch applied, copying it only if it was patched. """
+        if not self._patches:
+            return self._grid
+
+        grid = bytearray(
+            self._grid.encode('ascii') if isinstance(self._grid, str) else self._grid
+        )  # type: bytearray
+        for (row, column), letter in self._patches.items():
+            grid[row*self._axis_length + column] = ord(letter)
+
+        return grid
+
+    def locate(self, word: str) -> 'List[Location]':
+        """ Finds the row, column and direction of every occurrence of word. """
+        with phase('locate', words=1):
+            return self._get_locator().locate(word)
+
+    def count(self, word: str) -> int:
+        """ Counts the occurrences of word. """
+        return len(self.locate(word))
+
+    def locate_all(self, words: 'Iterable[str]') -> 'Dict[str, List[Location]]':
+        """ Finds every occurrence of each of the words, holding them all at once. """
+        with phase('locate.batch') as counts:
+            locations = self._get_locator().locate_all(words)  # type: Dict[str, List[Location]]
+            counts['words'] = len(locations)
+
+        return locations
+
+    def set_cell(self, row: int, column: int, letter: str) -> None:
+        """ Changes the letter of one cell of the grid. """
+        self.apply_patch(((row, column, letter),))
+
+    def apply_patch(self, cells: 'Iterable[Cell]') -> None:
+        """ Changes the letters of cells, given as (row, column, letter).
+
+        The data structure only updates what holds the cells. Cached
+        results are forgotten, and an index built just to locate words is
+        built again the next time a word is located.
+        """
+        cells = list(cells)
+        with phase('patch', items=len(cells)):
+            try:
+                self._data.apply_patch(cells)
+            except NotImplementedError:
+                raise RuntimeError('The {} data structure can\'t be changed!'.format(self.backend))
 
-        return self._cache[word]
+            self._cache.clear()
+            if self._locator is not self._data:
+                self._locator = None
+            for row, column, letter in cells:
+                self._patches[row, column] = letter
+
+    def stream(self, chunks: 'Iterable[List[str]]') -> 'Iterator[Result]':
+        """ Check chunks of words one at a time, yielding each word in order.
+
+        Only one chunk is held at once, so memory doesn't grow with the
+        number of words.
+        """
+        for chunk in chunks:
+            found = self.find_all(chunk)  # type: Set[str]
+            for word in chunk:
+                yield word, word in found
+
+    def close(self) -> None:
+        """ Release any worker processes held by the data structure. """
+        self._data.close()
+
+    def __enter__(self) -> 'WordSearch':
+        return self
+
+    def __exit__(
+                self,
+                exc_type: 'Optional[Type[BaseException]]',
+                exc_value: 'Optional[BaseException]',
+                traceback: 'Optional[TracebackType]',
+            ) -> None:
+        self.close()
+
+
+def _load_search(path: Path, arguments: 'ParsedArguments') -> WordSearch:
+    """ Load the grid at path into the WordSearch chosen by the arguments. """
+    grid = path  # type: Union[bytes, Path]
+    if not arguments.tiled and arguments.backend != 'tiled':
+        grid = read_grid_bytes(path)
+
+    return WordSearch(
+        grid,
+        use_trie=arguments.trie,
+        multiprocessing=arguments.multiprocess,
+        use_suffix_array=arguments.suffix_array,
+        index_dir=arguments.index_dir,
+        all_directions=arguments.all_directions,
+        use_anchors=arguments.anchored,
+        use_bitsets=arguments.bitset,
+        use_kgrams=arguments.kgram,
+        use_tiles=arguments.tiled,
+        cache_size=arguments.cache_size,
+        backend=arguments.backend,
+        word_count=(
+            count_words(arguments.words)
+            if arguments.backend == AUTO and arguments.words is not None
+            else None
+        ),
+    )
 
 
 if __name__ == "__main__":
@@ -66,30 +268,150 @@ if __name__ == "__main__":
     parser.add_argument(
         'words',
         type=Path,
-        help='The list of words to check'
+        nargs='?',
+        help='The list of words to check, unless serving'
     )
-    parser.add_argument(
+    structures = parser.add_mutually_exclusive_group()
+    structures.add_argument(
+        '--backend',
+        choices=sorted(BACKENDS) + [AUTO],
+        help='The data structure to use, or auto to pick one for the grid and words.',
+    )
+    structures.add_argument(
         '--trie',
         help='Use trie data structure.',
         action='store_true',
     )
+    structures.add_argument(
+        '--suffix-array',
+        help='Use suffix array data structure.',
+        action='store_true',
+    )
+    structures.add_argument(
+        '--kgram',
+        help='Use packed k-gram tables, limited to 12 letter words.',
+        action='store_true',
+    )
+    structures.add_argument(
+        '--bitset',
+        help='Match words against per letter bitsets of every row/column.',
+        action='store_true',
+    )
+    structures.add_argument(
+        '--anchored',
+        help='Only check the grid around the rarest letter of each word.',
+        action='store_true',
+    )
+    structures.add_argument(
+        '--tiled',
+        help='Search the memory mapped grid file one tile at a time.',
+        action='store_true',
+    )
+    structures.add_argument(
+        '--all-directions',
+        help='Search backwards and diagonally as well as along rows/columns.',
+        action='store_true',
+    )
     parser.add_argument(
         '--multiprocess',
         help='Use multiple processes to search for words/generate Trie.',
         action='store_true',
     )
+    parser.add_argument(
+        '--index-dir',
+        type=Path,
+        help='Directory in which to save and reuse built indexes.',
+    )
+    parser.add_argument(
+        '--batch',
+        help='Search for all words at once using a single automaton.',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--locate',
+        help='Print the row, column and direction of every occurrence of each word.',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=CACHE_SIZE,
+        help='The number of results to cache, or 0 to disable the cache.',
+    )
+    parser.add_argument(
+        '--stream',
+        help='Read words and write JSON lines results in chunks of words.',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=WORD_CHUNK_SIZE,
+        help='The number of words read at once when streaming.',
+    )
+    parser.add_argument(
+        '--serve',
+        metavar='SOCKET',
+        help='Keep the grid loaded and answer queries sent to a unix socket.',
+    )
+    parser.add_argument(
+        '--extra-grid',
+        type=Path,
+        action='append',
+        default=[],
+        help='Another grid file to serve, queried by its file name.',
+    )
+    parser.add_argument(
+        '--instrument',
+        nargs='?',
+        const=STDERR,
+        metavar='FILE',
+        help='Report timings, counts and memory of each phase as JSON to FILE, or stderr.',
+    )
 
     arguments = parser.parse_args()  # type: ParsedArguments
+    if arguments.words is None and arguments.serve is None:
+        parser.error('the words file is required unless serving')
+    if arguments.instrument is not None:
+        enable(arguments.instrument)
 
-    grid = read_grid(arguments.grid)  # type: str
-    words_to_find = read_words(arguments.words)  # type: List[str]
-
-    ws = WordSearch(
-        grid,
-        use_trie=arguments.trie,
-        multiprocessing=arguments.multiprocess,
-    )  # type: WordSearch
-
-    for word in words_to_find:
-        if ws.is_present(word):
-            print("found {}".format(word))
+    if arguments.serve is not None:
+        searches = {
+            path.stem: _load_search(path, arguments)
+            for path in [arguments.grid] + arguments.extra_grid
+        }  # type: Dict[str, WordSearch]
+        server = QueryServer(arguments.serve, searches)  # type: QueryServer
+        print('Serving {} on {}'.format(', '.join(searches), arguments.serve))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            Path(arguments.serve).unlink()
+            for search in searches.values():
+                search.close()
+    else:
+        with _load_search(arguments.grid, arguments) as ws:
+            if arguments.stream:
+                write_results(
+                    stdout,
+                    ws.stream(iter_words(arguments.words, arguments.chunk_size)),
+                )
+            elif arguments.locate:
+                # Located one word at a time, so only one word's occurrences
+                # are held at once.
+                for word in read_words(arguments.words):
+                    for row, column, direction in ws.locate(word):
+                        print("found {} at {},{} {}".format(word, row, column, direction))
+            elif arguments.batch:
+                words_to_find = read_words(arguments.words)
+                found = ws.find_all(words_to_find)  # type: Set[str]
+                for word in words_to_find:
+                    if word in found:
+                        print("found {}".format(word))
+            else:
+                words_to_find = read_words(arguments.words)
+                for word in words_to_find:
+                    if ws.is_present(word):
+                        print("found {}".format(word))